@@ -1,7 +1,6 @@
 import asyncio
 import os
 import random
-from dataclasses import asdict
 import websockets  # type: ignore
 from pathlib import Path
 import sys
@@ -12,7 +11,7 @@ def _add_root(marker="toolkit"):
         if (parent/marker).exists() and str(parent) not in sys.path: sys.path.append(str(parent)); return
 _add_root()
 
-from toolkit.events import new_event
+from toolkit.events import new_event, to_json
 from toolkit.style import stylize
 
 def _with_token(url, token):
@@ -26,7 +25,7 @@ async def main():
         while True:
             n+=1
             ev=new_event("grid.tick","grid:loop","tick",{"n":n,"rand":rng.random()}, meta={"grid":"main"})
-            await ws.send(__import__("json").dumps(asdict(ev)))
+            await ws.send(to_json(ev))
             await asyncio.sleep(tick_ms/1000)
 
 if __name__=="__main__":
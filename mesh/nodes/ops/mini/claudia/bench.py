@@ -0,0 +1,271 @@
+"""
+Vector memory benchmarks - no model download, no API key
+
+Runs VectorMemoryStore against synthetic corpora with the deterministic hash
+encoder and writes machine-readable results:
+
+    python bench.py                                   # 10k, 100k and 1M memories
+    python bench.py --sizes 10000 --out bench.json
+    python bench.py --set vector_codec=pq --set index_policy=hnsw
+    python bench.py --set encoder_workers=4           # ingest through the encoder pool
+
+Scenarios per corpus size: bulk ingest throughput, single store_memory
+latency, search_memories p50/p99, batch search throughput, cold-start time
+to ready (fresh process) and resident memory.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Union, get_args, get_origin, get_type_hints
+
+import numpy as np
+
+from smol import VectorGobConfig, VectorMemoryStore
+
+# =============================================================================
+# SYNTHETIC CORPUS
+# =============================================================================
+
+def vocabulary(size: int = 5000, seed: int = 0) -> List[str]:
+    """Pronounceable pseudo-words, so texts share tokens the way real chat does"""
+    rng = np.random.default_rng(seed)
+    syllables = [c + v for c in "bdfgklmnprstvz" for v in "aeiou"]
+    return ["".join(rng.choice(syllables, rng.integers(1, 4))) for _ in range(size)]
+
+def corpus(n: int, seed: int = 0) -> List[str]:
+    """n memories of 6-24 words with a Zipf-ish word distribution"""
+    words = np.array(vocabulary(seed=seed))
+    rng = np.random.default_rng(seed + 1)
+    weights = 1 / np.arange(1, len(words) + 1)
+    weights /= weights.sum()
+    lengths = rng.integers(6, 25, n)
+    tokens = words[rng.choice(len(words), lengths.sum(), p=weights)]
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    return [f"{i} " + " ".join(tokens[offsets[i]:offsets[i + 1]]) for i in range(n)]
+
+def queries(texts: List[str], count: int, seed: int = 2) -> List[str]:
+    """Stored texts with a word dropped: near, but not exact, repeats"""
+    rng = np.random.default_rng(seed)
+    picked = []
+    for i in rng.choice(len(texts), min(count, len(texts)), replace=False):
+        words = texts[i].split()
+        del words[rng.integers(1, len(words))]
+        picked.append(" ".join(words))
+    return picked
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def latency(samples_s: List[float]) -> Dict[str, float]:
+    ms = np.array(samples_s) * 1000
+    return {
+        'n': len(ms),
+        'mean_ms': float(ms.mean()),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'max_ms': float(ms.max())
+    }
+
+def rss_mb() -> Dict[str, float]:
+    """Current and peak resident set size"""
+    current = 0.0
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    current = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+    return {'rss_mb': current, 'peak_rss_mb': peak}
+
+def parse_overrides(pairs: List[str]) -> Dict[str, Any]:
+    """--set key=value pairs, typed after the VectorGobConfig annotations (JSON for dict/list fields, 'none' for None)"""
+    types = get_type_hints(VectorGobConfig)
+    overrides = {}
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        if key not in types:
+            raise SystemExit(f"Unknown config field: {key}")
+        kind = types[key]
+        if get_origin(kind) is Union:
+            kind = next(arg for arg in get_args(kind) if arg is not type(None))
+        try:
+            if value.lower() in ("none", "null"):
+                overrides[key] = None
+            elif kind is bool:
+                overrides[key] = value.lower() in ("1", "true", "yes")
+            elif get_origin(kind) in (dict, list):
+                overrides[key] = json.loads(value)
+            else:
+                overrides[key] = kind(value)
+        except ValueError:
+            raise SystemExit(f"Bad value for {key}: {value!r}")
+    return overrides
+
+def make_config(workdir: Path, overrides: Dict[str, Any]) -> VectorGobConfig:
+    settings = dict(
+        encoder_backend="hash",
+        lazy_load=False,
+        db_path=str(workdir / "bench.db"),
+        index_path=str(workdir / "bench.idx"),
+        similarity_threshold=-1.0,  # Every search returns `limit` hits, so hydration is measured too
+        retention_interval_s=0
+    )
+    settings.update(overrides)
+    return VectorGobConfig(**settings)
+
+# =============================================================================
+# SCENARIOS
+# =============================================================================
+
+def bench_size(size: int, args, overrides: Dict[str, Any]) -> Dict[str, Any]:
+    workdir = Path(tempfile.mkdtemp(prefix=f"vgob-bench-{size}-"))
+    try:
+        texts = corpus(size)
+        result: Dict[str, Any] = {'size': size}
+
+        store = VectorMemoryStore(make_config(workdir, overrides))
+
+        # Bulk ingest: store_memories in fixed batches
+        started = time.perf_counter()
+        for start in range(0, size, args.batch):
+            store.store_memories([(text, "user_input", None) for text in texts[start:start + args.batch]])
+        store.db.flush()
+        ingest_s = time.perf_counter() - started
+        result['ingest'] = {'seconds': ingest_s, 'memories_per_s': size / ingest_s, 'batch': args.batch}
+
+        # Background index migrations count against ingest, not search
+        started = time.perf_counter()
+        if store._migration_thread:
+            store._migration_thread.join()
+        result['ingest']['migration_wait_s'] = time.perf_counter() - started
+        result['index'] = store.get_memory_stats()['index']
+        result['codec'] = store.get_memory_stats()['codec']
+
+        # Single writes through the public path (batcher included)
+        samples = []
+        for i in range(args.writes):
+            started = time.perf_counter()
+            store.store_memory(f"bench write {i} {texts[i % size]}", "bot_response")
+            samples.append(time.perf_counter() - started)
+        result['store_memory'] = latency(samples)
+
+        # Search latency, one query at a time
+        probe = queries(texts, args.queries)
+        store.search_memories(probe[0], limit=args.limit)  # First-call costs are not steady state
+        samples = []
+        for query in probe:
+            started = time.perf_counter()
+            store.search_memories(query, limit=args.limit)
+            samples.append(time.perf_counter() - started)
+        result['search_memories'] = latency(samples)
+
+        # The same queries in one batch call
+        started = time.perf_counter()
+        store.search_memories_batch(probe, limit=args.limit)
+        batch_s = time.perf_counter() - started
+        result['search_memories_batch'] = {'queries': len(probe), 'seconds': batch_s, 'queries_per_s': len(probe) / batch_s}
+
+        result['memory'] = rss_mb()
+        result['disk_mb'] = sum(p.stat().st_size for p in workdir.iterdir()) / (1024 * 1024)
+        store.close()
+
+        # Cold start in a fresh interpreter, so page cache is the only thing shared
+        command = [sys.executable, str(Path(__file__).resolve()), "--cold-start", str(workdir)]
+        for pair in args.set:
+            command += ["--set", pair]  # As given: parse_overrides reads dict/list values as JSON, not repr
+        child = subprocess.run(command, capture_output=True, text=True, check=True)
+        result['cold_start'] = json.loads(child.stdout)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+def cold_start(workdir: Path, overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Child-process side of the cold-start scenario"""
+    before = rss_mb()['rss_mb']
+    started = time.perf_counter()
+    store = VectorMemoryStore(make_config(workdir, overrides))
+    ready_s = time.perf_counter() - started
+    memory = rss_mb()
+    report = {
+        'ready_s': ready_s,
+        'startup': dict(store.startup_times),
+        'rss_mb': memory['rss_mb'],
+        'rss_growth_mb': memory['rss_mb'] - before,
+        'memories': store.index.ntotal
+    }
+    store.close()
+    return report
+
+def environment() -> Dict[str, Any]:
+    import faiss
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                  cwd=Path(__file__).parent).stdout.strip()
+    except OSError:
+        revision = ""
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_revision': revision,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'faiss': faiss.__version__
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="VectorMemoryStore benchmarks with a deterministic stub encoder")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated corpus sizes")
+    parser.add_argument("--batch", type=int, default=256, help="memories per store_memories() call during ingest")
+    parser.add_argument("--writes", type=int, default=200, help="single store_memory() calls timed")
+    parser.add_argument("--queries", type=int, default=500, help="search queries timed")
+    parser.add_argument("--limit", type=int, default=5, help="results per search")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="VectorGobConfig override")
+    parser.add_argument("--out", help="write results JSON here (default: stdout only)")
+    parser.add_argument("--keep", action="store_true", help="keep the per-size working directories")
+    parser.add_argument("--cold-start", metavar="DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    overrides = parse_overrides(args.set)
+
+    # The store logs to stdout; keep stdout for JSON
+    if args.cold_start:
+        with contextlib.redirect_stdout(sys.stderr):
+            report = cold_start(Path(args.cold_start), overrides)
+        print(json.dumps(report))
+        return
+
+    report = {'environment': environment(), 'config': overrides, 'results': []}
+    for size in [int(s) for s in args.sizes.split(",") if s]:
+        with contextlib.redirect_stdout(sys.stderr):
+            result = bench_size(size, args, overrides)
+        report['results'].append(result)
+        print(f"// {size:>8} memories | ingest {result['ingest']['memories_per_s']:.0f}/s"
+              f" | store p99 {result['store_memory']['p99_ms']:.2f}ms"
+              f" | search p50 {result['search_memories']['p50_ms']:.2f}ms p99 {result['search_memories']['p99_ms']:.2f}ms"
+              f" | batch {result['search_memories_batch']['queries_per_s']:.0f} q/s"
+              f" | cold start {result['cold_start']['ready_s']:.2f}s | rss {result['memory']['rss_mb']:.0f}MB",
+              file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
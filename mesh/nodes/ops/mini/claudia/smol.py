@@ -1,17 +1,57 @@
+from __future__ import annotations
 
+import time
+_IMPORT_STARTED = time.perf_counter()
 
-import numpy as np
+import importlib
 import json
 import os
+import random
 import sqlite3
+import sys
 import requests
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional, Tuple
-from sentence_transformers import SentenceTransformer
-import faiss
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
 import hashlib
+from collections import OrderedDict
+from array import array
+import queue
+import threading
+import fcntl
+import zlib
+import itertools
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import Future
+
+def _add_root(marker="toolkit"):
+    here=Path(__file__).resolve()
+    for parent in [here.parent] + list(here.parents):
+        if (parent/marker).exists() and str(parent) not in sys.path:
+            sys.path.append(str(parent)); return
+_add_root()
+
+from toolkit.sse import sse_deltas
+
+class _LazyModule:
+    """Module proxy that imports on first attribute access"""
+    
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+    
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# Heavy dependencies load on the warm-up thread, not at import time
+np = _LazyModule("numpy")
+faiss = _LazyModule("faiss")
+
+MODULE_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
 
 # =============================================================================
 # CONFIGURATION - Minimalist but Powerful
@@ -22,6 +62,9 @@ class VectorGobConfig:
     """Clean, typed configuration"""
     # Core Settings
     model_name: str = "all-MiniLM-L6-v2"  # Fast, efficient sentence transformer
+    encoder_backend: str = "sentence-transformers"  # or 'hash': deterministic stub, no model download
+    encoder_workers: int = 0  # Encoder processes, each with its own model (0 = encode on the calling thread)
+    encoder_chunk_size: int = 64  # Texts per worker task
     openai_model: str = "gpt-4o-mini"
     temperature: float = 0.7
     max_tokens: int = 800
@@ -29,12 +72,61 @@ class VectorGobConfig:
     # Memory Settings
     vector_dim: int = 384  # all-MiniLM-L6-v2 dimension
     memory_limit: int = 1000  # Max stored memories
+    memory_lru_size: int = 5000  # Hydrated search hits kept in RAM
+    embedding_cache_size: int = 10000  # Content-hash -> vector entries kept in RAM
+    embedding_store_dtype: str = "float32"  # Embedding BLOB precision: 'float32' or 'float16'
     similarity_threshold: float = 0.75  # Relevance cutoff
     context_memories: int = 3  # Max memories to inject
+    filter_exact_max: int = 4096  # Filtered searches matching at most this many memories score them all exactly
+    
+    # Response Cache
+    response_cache: bool = False  # Answer near-repeat prompts with an earlier reply instead of the API
+    response_cache_threshold: float = 0.95  # Prompt similarity needed for a hit
+    response_cache_ttl_s: float = 3600.0  # Cached replies expire after this long
+    response_cache_size: int = 1000  # Prompts remembered (oldest replaced first)
+    
+    # Startup
+    lazy_load: bool = True  # Load encoder and index on a background thread
+    
+    # Ingestion
+    batch_window_ms: float = 5.0  # Collector wait for concurrent writes (0 = take only what is already queued)
+    batch_max_size: int = 64  # Max memories per encode() call
+    
+    # Index Policy
+    index_policy: str = "ivf"  # ANN tier past ann_threshold: 'ivf', 'hnsw' or 'flat' (never migrate)
+    ann_threshold: int = 50000  # Vectors kept in the exact flat index before migrating
+    ivf_nlist: int = 0  # Coarse clusters (0 = 4 * sqrt(n))
+    ivf_nprobe: int = 16  # Clusters scanned per query
+    hnsw_m: int = 32  # Graph degree
+    hnsw_ef_construction: int = 80
+    hnsw_ef_search: int = 64  # Candidate list size per query
+    
+    # Vector Compression
+    vector_codec: str = "float32"  # Index storage: 'float32', 'fp16' (2x smaller), 'int8' (4x) or 'pq' (32x at pq_m=48)
+    pq_m: int = 48  # PQ sub-quantizers, one byte each; must divide vector_dim
+    codec_train_size: int = 10000  # Vectors kept at float32 before training an int8/pq codec
+    rerank_factor: int = 4  # Quantized hits re-scored exactly per result wanted (0 = no re-rank)
+    
+    # Retention
+    retention_max_count: int = 0  # Memories kept overall (0 = unlimited)
+    retention_max_age_days: float = 0  # Older memories are purged (0 = keep forever)
+    retention_context_quotas: Dict[str, int] = None  # Per context_type caps, e.g. {'system_event': 500}
+    retention_session_quota: int = 0  # Memories kept per session_id (0 = unlimited)
+    retention_interval_s: float = 3600.0  # Background compaction cadence (0 = manual only)
+    retention_vacuum: bool = True  # Reclaim disk after purging
     
     # Storage
     db_path: str = "./vector_memory.db"
+    sqlite_wal: bool = True  # WAL journal: readers proceed while a write commits
+    commit_window_ms: float = 10.0  # Group-commit wait for more queued writes (0 = flush backlog only)
+    commit_max_ops: int = 256  # Max queued writes per transaction
     index_path: str = "./faiss_index.idx" 
+    index_persistence: str = "log"  # 'log' (append-only + snapshots) or 'snapshot' (rewrite per write)
+    snapshot_every: int = 5000  # Logged vectors that trigger snapshot compaction
+    snapshot_interval_s: float = 600.0  # Max seconds between snapshots while writing (0 disables)
+    index_role: str = "private"  # 'private' (own copy in RAM), 'writer' (publishes generations) or 'reader' (mmaps them)
+    generation_interval_s: float = 5.0  # Writer tail / reader poll cadence for shared generations
+    generation_keep: int = 3  # Published generations left on disk for readers still mapping them
     
     # Identity
     system_prompt: str = """You are Vector GOB - a terminal consciousness with perfect memory.
@@ -49,6 +141,8 @@ Every interaction builds your knowledge graph. You remember everything."""
     acronyms: List[str] = None
     
     def __post_init__(self):
+        if self.retention_context_quotas is None:
+            self.retention_context_quotas = {}
         if self.acronyms is None:
             self.acronyms = [
                 "Vector Ghost Of Being", "Virtualized Grain Of Brilliance",
@@ -81,22 +175,847 @@ class Memory:
             'metadata': self.metadata or {}
         }
 
+def memory_label(memory_id: str) -> int:
+    """Stable int64 index label for a 12-hex-digit memory id"""
+    return int(memory_id, 16)
+
+def label_memory_id(label: int) -> str:
+    """Inverse of memory_label"""
+    return f"{label:012x}"
+
+def index_labels(index) -> np.ndarray:
+    """Labels of every vector in an ID-keyed index"""
+    if hasattr(index, "id_map"):
+        return faiss.vector_to_array(index.id_map)
+    ivf = faiss.extract_index_ivf(index)
+    invlists = ivf.invlists
+    chunks = [faiss.rev_swig_ptr(invlists.get_ids(i), invlists.list_size(i)).copy()
+              for i in range(ivf.nlist) if invlists.list_size(i)]
+    return np.concatenate(chunks) if chunks else np.empty(0, np.int64)
+
+def index_tier(index) -> str:
+    """'flat', 'ivf' or 'hnsw'"""
+    if faiss.try_extract_index_ivf(index) is not None:
+        return "ivf"
+    if hasattr(index, "index") and hasattr(faiss.downcast_index(index.index), "hnsw"):
+        return "hnsw"
+    return "flat"
+
+# Factory suffix per vector_codec; int8 and pq must be trained before vectors go in
+VECTOR_CODECS = {'float32': "Flat", 'fp16': "SQfp16", 'int8': "SQ8", 'pq': "PQ{pq_m}"}
+TRAINED_CODECS = ("int8", "pq")
+
+def index_codec(index) -> str:
+    """'float32', 'fp16', 'int8' or 'pq'"""
+    codes = faiss.try_extract_index_ivf(index)
+    if codes is not None:
+        codes = faiss.downcast_index(codes)
+    elif hasattr(index, "index"):
+        codes = faiss.downcast_index(index.index)
+        if hasattr(codes, "hnsw"):
+            codes = faiss.downcast_index(codes.storage)
+    if hasattr(codes, "sq"):
+        return "fp16" if codes.sq.qtype == faiss.ScalarQuantizer.QT_fp16 else "int8"
+    if hasattr(codes, "pq"):
+        return "pq"
+    return "float32"
+
+def index_layout(index) -> Tuple[str, str]:
+    """(tier, codec)"""
+    return index_tier(index), index_codec(index)
+
+class HashEncoder:
+    """Deterministic SentenceTransformer stand-in: hashed bag of words through a fixed random projection"""
+    
+    def __init__(self, dim: int, buckets: int = 4096, seed: int = 0):
+        self.buckets = buckets
+        self._projection = np.random.default_rng(seed).standard_normal((buckets, dim)).astype(np.float32)
+    
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        rows, buckets = [], []
+        for i, text in enumerate(texts):
+            for token in text.lower().split() or [""]:
+                rows.append(i)
+                buckets.append(zlib.crc32(token.encode()) % self.buckets)
+        vectors = np.zeros((len(texts), self._projection.shape[1]), np.float32)
+        np.add.at(vectors, rows, self._projection[buckets])  # Shared words -> similar vectors
+        return vectors
+
+def load_encoder(backend: str, model_name: str, dim: int, threads: int = 0):
+    """An object with SentenceTransformer's encode(texts) for the configured backend"""
+    if backend == "hash":
+        return HashEncoder(dim)
+    from sentence_transformers import SentenceTransformer
+    if threads:
+        import torch
+        torch.set_num_threads(threads)  # Pool workers split the cores instead of each grabbing all of them
+    return SentenceTransformer(model_name)
+
+def _encoder_worker(backend: str, model_name: str, dim: int, threads: int,
+                    tasks: multiprocessing.Queue, results: multiprocessing.Queue):
+    """EncoderPool process: encode chunks straight into the caller's shared-memory result buffer"""
+    try:
+        encoder = load_encoder(backend, model_name, dim, threads)
+    except Exception as e:
+        results.put((None, 0, f"{type(e).__name__}: {e}"))
+        return
+    results.put((None, 0, None))
+    
+    import numpy
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job, start, texts, buffer_name, total = task
+        error = None
+        try:
+            vectors = numpy.asarray(encoder.encode(texts), dtype=numpy.float32)
+            buffer = shared_memory.SharedMemory(name=buffer_name)
+            try:
+                numpy.ndarray((total, dim), numpy.float32, buffer=buffer.buf)[start:start + len(texts)] = vectors
+            finally:
+                buffer.close()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        results.put((job, len(texts), error))
+
+class EncoderPool:
+    """encode() across worker processes that each hold a model; vectors return through shared memory"""
+    
+    def __init__(self, backend: str, model_name: str, dim: int, workers: int, chunk_size: int = 64):
+        self.dim = dim
+        self.chunk_size = max(1, chunk_size)
+        context = multiprocessing.get_context("spawn")  # Forking a process with live threads is unsafe
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        self._workers = [context.Process(target=_encoder_worker, name=f"vgob-encoder-{i}", daemon=True,
+                                         args=(backend, model_name, dim, threads, self._tasks, self._results))
+                         for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+        
+        # Every worker reports once its model is loaded
+        errors = [error for _, _, error in (self._results.get() for _ in self._workers) if error]
+        if errors:
+            self.close()
+            raise RuntimeError(f"Encoder worker failed to start: {errors[0]}")
+        
+        self._jobs: Dict[int, List[Any]] = {}  # job -> [texts outstanding, Future, first error]
+        self._job_ids = itertools.count()
+        self._down = None  # Why the pool stopped serving, once a worker has died
+        self._lock = threading.Lock()
+        self._collector = threading.Thread(target=self._collect, name="vgob-encoder-results", daemon=True)
+        self._collector.start()
+    
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        """Same contract as SentenceTransformer.encode: one float32 row per text"""
+        if not texts:
+            return np.empty((0, self.dim), np.float32)
+        buffer = shared_memory.SharedMemory(create=True, size=len(texts) * self.dim * 4)
+        try:
+            future = Future()
+            with self._lock:
+                if self._down:
+                    raise RuntimeError(f"Encoder pool is down: {self._down}")
+                job = next(self._job_ids)
+                self._jobs[job] = [len(texts), future, None]
+            for start in range(0, len(texts), self.chunk_size):
+                self._tasks.put((job, start, texts[start:start + self.chunk_size], buffer.name, len(texts)))
+            future.result()
+            return np.ndarray((len(texts), self.dim), np.float32, buffer=buffer.buf).copy()
+        finally:
+            buffer.close()
+            buffer.unlink()
+    
+    def _collect(self):
+        while True:
+            try:
+                item = self._results.get(timeout=0.5)
+            except queue.Empty:
+                # A worker killed mid-chunk never reports, so its job would wait forever
+                dead = [worker for worker in self._workers if not worker.is_alive()]
+                if dead and not self._down:
+                    self._fail(f"{dead[0].name} exited with code {dead[0].exitcode}")
+                continue
+            if item is None:
+                break
+            job, count, error = item
+            with self._lock:
+                state = self._jobs.get(job)
+                if state is None:
+                    continue
+                state[0] -= count
+                state[2] = state[2] or error
+                if state[0] > 0:
+                    continue
+                del self._jobs[job]
+            if state[2]:
+                state[1].set_exception(RuntimeError(f"Encoder worker failed: {state[2]}"))
+            else:
+                state[1].set_result(None)
+    
+    def _fail(self, reason: str):
+        """Fail every outstanding job; encode() raises from now on (their buffers are unlinked by encode)"""
+        with self._lock:
+            self._down = reason
+            jobs, self._jobs = self._jobs, {}
+        for _, future, _ in jobs.values():
+            future.set_exception(RuntimeError(f"Encoder pool is down: {reason}"))
+    
+    def close(self):
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
+        if getattr(self, "_collector", None):
+            self._results.put(None)
+            self._collector.join()
+        self._tasks.cancel_join_thread()  # Chunks no live worker will take must not block exit
+        self._tasks.close()
+        self._results.close()
+
+class LRUCache:
+    """Bounded key -> value cache in recency order"""
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._items: OrderedDict = OrderedDict()
+    
+    def get(self, key: str) -> Any:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+    
+    def put(self, key: str, value: Any):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+    
+    def discard(self, key: str):
+        self._items.pop(key, None)
+    
+    def __len__(self) -> int:
+        return len(self._items)
+
+class RecentMemories:
+    """The newest memories as parallel arrays in a ring: label, timestamp and interned session/context codes.
+    
+    Content stays in SQLite; resolve labels through VectorMemoryStore.get_memories when it is needed.
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._labels = None  # Allocated on first add so numpy can load lazily
+        self._timestamps = None  # Microseconds since the epoch
+        self._sessions = None
+        self._contexts = None
+        self._next = 0
+        self._size = 0
+        self._session_codes: Dict[str, int] = {}
+        self._context_codes: Dict[str, int] = {}
+        self._context_names: List[str] = []
+    
+    def add(self, labels: List[int], timestamps: List[datetime], session_ids: List[str], context_types: List[str]):
+        """Append memories, oldest first; the oldest cached ones fall off once full"""
+        if self._labels is None:
+            self._labels = np.full(self.capacity, -1, np.int64)
+            self._timestamps = np.zeros(self.capacity, np.int64)
+            self._sessions = np.zeros(self.capacity, np.int32)
+            self._contexts = np.zeros(self.capacity, np.int16)
+        count = len(labels)
+        if count > self.capacity:
+            labels, timestamps = labels[-self.capacity:], timestamps[-self.capacity:]
+            session_ids, context_types = session_ids[-self.capacity:], context_types[-self.capacity:]
+            count = self.capacity
+        slots = (self._next + np.arange(count)) % self.capacity
+        self._labels[slots] = labels
+        self._timestamps[slots] = [int(ts.timestamp() * 1_000_000) for ts in timestamps]
+        self._sessions[slots] = [self._session_code(sid) for sid in session_ids]
+        self._contexts[slots] = [self._context_code(ctx) for ctx in context_types]
+        self._next = (self._next + count) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+    
+    def remove(self, labels: np.ndarray):
+        """Drop the given labels, keeping the rest in order"""
+        if not self._size:
+            return
+        order = self._order()
+        keep = order[~np.isin(self._labels[order], labels)]
+        if len(keep) == len(order):
+            return
+        columns = [column[keep] for column in (self._labels, self._timestamps, self._sessions, self._contexts)]
+        self._labels[:] = -1
+        self._size, self._next = len(keep), len(keep) % self.capacity
+        for column, values in zip((self._labels, self._timestamps, self._sessions, self._contexts), columns):
+            column[:len(keep)] = values
+    
+    def labels(self, limit: int = None) -> np.ndarray:
+        """Cached labels, newest first"""
+        if not self._size:
+            return np.empty(0, np.int64)
+        return self._labels[self._order()[::-1][:limit]]
+    
+    def stats(self, session_id: str) -> Dict[str, Any]:
+        """Per-context counts for the cache and one session, plus the age span the cache covers"""
+        if not self._size:
+            return {'size': 0, 'session': 0, 'contexts': {}, 'session_contexts': {}, 'span_s': 0.0}
+        live = self._order()
+        contexts = self._contexts[live]
+        in_session = self._sessions[live] == self._session_codes.get(session_id, -1)
+        totals = np.bincount(contexts, minlength=len(self._context_names))
+        session_totals = np.bincount(contexts[in_session], minlength=len(self._context_names))
+        timestamps = self._timestamps[live]
+        return {
+            'size': self._size,
+            'session': int(in_session.sum()),
+            'contexts': {name: int(n) for name, n in zip(self._context_names, totals) if n},
+            'session_contexts': {name: int(n) for name, n in zip(self._context_names, session_totals) if n},
+            'span_s': float(timestamps.max() - timestamps.min()) / 1_000_000
+        }
+    
+    def _order(self) -> np.ndarray:
+        """Slots oldest to newest"""
+        return (self._next - self._size + np.arange(self._size)) % self.capacity
+    
+    def _session_code(self, session_id: str) -> int:
+        return self._session_codes.setdefault(session_id, len(self._session_codes))
+    
+    def _context_code(self, context_type: str) -> int:
+        code = self._context_codes.get(context_type)
+        if code is None:
+            code = self._context_codes[context_type] = len(self._context_names)
+            self._context_names.append(context_type)
+        return code
+    
+    def __len__(self) -> int:
+        return self._size
+
+class LabelPartitions:
+    """Every stored memory label grouped by (session, context), so filtered searches skip the SQLite id scan"""
+    
+    def __init__(self):
+        self._groups: Dict[Tuple[str, str], array] = {}
+        self._size = 0
+    
+    def add(self, labels: List[int], session_ids: List[str], context_types: List[str]):
+        for label, session_id, context_type in zip(labels, session_ids, context_types):
+            group = self._groups.get((session_id, context_type))
+            if group is None:
+                group = self._groups[(session_id, context_type)] = array('q')
+            group.append(label)
+        self._size += len(labels)
+    
+    def remove(self, labels: np.ndarray):
+        for key, group in list(self._groups.items()):
+            values = np.frombuffer(group, np.int64)
+            keep = values[~np.isin(values, labels)]
+            if len(keep) == len(values):
+                continue
+            self._size -= len(values) - len(keep)
+            del values  # Release the buffer before the group is replaced
+            if len(keep):
+                self._groups[key] = array('q', keep.tobytes())
+            else:
+                del self._groups[key]
+    
+    def labels(self, session_id: str = None, context_type: str = None) -> np.ndarray:
+        """Labels in every group matching the given filters (a copy, safe to use outside the lock)"""
+        groups = [np.frombuffer(group, np.int64) for (sid, ctx), group in self._groups.items()
+                  if (not session_id or sid == session_id) and (not context_type or ctx == context_type)]
+        return np.concatenate(groups) if groups else np.empty(0, np.int64)
+    
+    def __len__(self) -> int:
+        return self._size
+
+@dataclass
+class IngestStats:
+    """Embedding batch counters"""
+    batches: int = 0
+    memories: int = 0
+    max_batch: int = 0
+    encode_seconds: float = 0.0
+    
+    def record(self, batch_size: int, seconds: float):
+        self.batches += 1
+        self.memories += batch_size
+        self.max_batch = max(self.max_batch, batch_size)
+        self.encode_seconds += seconds
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'batches': self.batches,
+            'memories': self.memories,
+            'avg_batch': self.memories / self.batches if self.batches else 0.0,
+            'max_batch': self.max_batch,
+            'encode_per_sec': self.memories / self.encode_seconds if self.encode_seconds else 0.0
+        }
+
+class ResponseCache:
+    """Replies keyed by prompt vector, served again for near-identical prompts under the same fingerprint"""
+    
+    def __init__(self, threshold: float, ttl_s: float, capacity: int):
+        self.threshold = threshold
+        self.ttl_s = ttl_s
+        self.capacity = max(1, capacity)
+        self._vectors = None  # (capacity, dim) ring, allocated on first put so numpy can load lazily
+        self._expires = None
+        self._entries: List[Optional[Tuple[str, str, float]]] = [None] * self.capacity  # (fingerprint, reply, llm seconds)
+        self._next = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'saved_s': 0.0, 'invalidated': 0}
+    
+    def get(self, vector: np.ndarray, fingerprint: str) -> Optional[str]:
+        """Best live reply above the threshold, or None"""
+        with self._lock:
+            if self._vectors is not None:
+                similarities = self._vectors @ vector
+                similarities[self._expires <= time.monotonic()] = -np.inf
+                candidates = np.flatnonzero(similarities >= self.threshold)
+                for slot in candidates[np.argsort(-similarities[candidates])]:
+                    entry = self._entries[slot]
+                    if entry and entry[0] == fingerprint:
+                        self.stats['hits'] += 1
+                        self.stats['saved_s'] += entry[2]
+                        return entry[1]
+            self.stats['misses'] += 1
+            return None
+    
+    def put(self, vector: np.ndarray, fingerprint: str, reply: str, llm_seconds: float):
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, len(vector)), np.float32)
+                self._expires = np.zeros(self.capacity)
+            slot = self._next
+            self._next = (slot + 1) % self.capacity
+            self._vectors[slot] = vector
+            self._expires[slot] = time.monotonic() + self.ttl_s
+            self._entries[slot] = (fingerprint, reply, llm_seconds)
+    
+    def invalidate(self, fingerprint: str = None) -> int:
+        """Drop every entry, or only those under one fingerprint; returns how many were live"""
+        with self._lock:
+            dropped = 0
+            for slot, entry in enumerate(self._entries):
+                if entry and (fingerprint is None or entry[0] == fingerprint):
+                    dropped += self._expires[slot] > time.monotonic()
+                    self._entries[slot] = None
+                    self._expires[slot] = 0
+            self.stats['invalidated'] += dropped
+            return int(dropped)
+    
+    def __len__(self) -> int:
+        if self._expires is None:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            return sum(1 for slot, entry in enumerate(self._entries) if entry and self._expires[slot] > now)
+
+@dataclass
+class TurnStats:
+    """Per-stage chat latency: the last turn and running averages"""
+    turns: int = 0
+    last: Dict[str, float] = field(default_factory=dict)
+    totals: Dict[str, float] = field(default_factory=dict)
+    counts: Dict[str, int] = field(default_factory=dict)
+    
+    def record(self, stage: str, seconds: float):
+        self.last[stage] = seconds
+        self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'turns': self.turns,
+            'last_ms': {stage: seconds * 1000 for stage, seconds in self.last.items()},
+            'avg_ms': {stage: self.totals[stage] / self.counts[stage] * 1000 for stage in self.totals}
+        }
+
+class EmbeddingBatcher:
+    """Background collector grouping concurrent writes into one encode() call"""
+    
+    def __init__(self, store: "VectorMemoryStore", window_ms: float, max_size: int):
+        self.store = store
+        self.window = window_ms / 1000
+        self.max_size = max(1, max_size)
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="vgob-batcher", daemon=True)
+        self._thread.start()
+    
+    def submit(self, content: str, context_type: str, metadata: Dict[str, Any] = None) -> Future:
+        """Queue a memory; the future resolves to its id"""
+        future = Future()
+        self._queue.put((content, context_type, metadata, future))
+        return future
+    
+    def close(self):
+        """Flush pending writes and stop the collector"""
+        self._queue.put(None)
+        self._thread.join()
+    
+    def _run(self):
+        running = True
+        while running:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+            self._flush(batch)
+    
+    def _flush(self, batch: List[Tuple[str, str, Dict[str, Any], Future]]):
+        try:
+            ids = self.store.store_memories([(content, ctx, meta) for content, ctx, meta, _ in batch])
+        except Exception as e:
+            for *_, future in batch:
+                future.set_exception(e)
+            return
+        for (*_, future), memory_id in zip(batch, ids):
+            future.set_result(memory_id)
+
+class VectorLog:
+    """Append-only (label, vector) log replayed on top of the last index snapshot"""
+    
+    MAGIC = b"VGOBLOG1"
+    
+    def __init__(self, path: Path, dim: int):
+        self.path = path
+        self.dtype = np.dtype([('label', '<i8'), ('vector', '<f4', (dim,))])
+        self.records = 0
+        self._file = None
+    
+    def read(self) -> np.ndarray:
+        """Return all complete records, dropping a torn tail from an interrupted append"""
+        if not self.path.exists():
+            return np.empty(0, self.dtype)
+        with open(self.path, 'rb') as f:
+            if f.read(len(self.MAGIC)) != self.MAGIC:
+                raise ValueError(f"Unrecognized vector log: {self.path}")
+            data = f.read()
+        count = len(data) // self.dtype.itemsize
+        if count * self.dtype.itemsize != len(data):
+            with open(self.path, 'r+b') as f:
+                f.truncate(len(self.MAGIC) + count * self.dtype.itemsize)
+        return np.frombuffer(data, self.dtype, count)
+    
+    def read_since(self, start: int) -> np.ndarray:
+        """Complete records from record `start` on; a torn tail is left alone, the writer may still be appending"""
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(len(self.MAGIC) + start * self.dtype.itemsize)
+                data = f.read()
+        except FileNotFoundError:
+            return np.empty(0, self.dtype)
+        return np.frombuffer(data, self.dtype, len(data) // self.dtype.itemsize)
+    
+    def open(self) -> np.ndarray:
+        """Open for appending and return the records to replay"""
+        records = self.read()
+        if not self.path.exists():
+            self.rewrite(records)
+        else:
+            self._file = open(self.path, 'ab')
+            self.records = len(records)
+        return records
+    
+    def append(self, labels: np.ndarray, vectors: np.ndarray):
+        records = np.empty(len(labels), self.dtype)
+        records['label'] = labels
+        records['vector'] = vectors
+        self._file.write(records.tobytes())
+        self._file.flush()
+        self.records += len(records)
+    
+    def rewrite(self, records: np.ndarray):
+        """Atomically replace the log contents"""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(records.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        if self._file:
+            self._file.close()
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, 'ab')
+        self.records = len(records)
+    
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+INSERT_MEMORY_SQL = """
+    INSERT INTO memories (id, timestamp, content, context_type, session_id, metadata, embedding_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_EMBEDDING_SQL = "INSERT OR IGNORE INTO embeddings (hash, vector) VALUES (?, ?)"
+
+class SQLiteStore:
+    """Long-lived connections: one reader per thread plus a single group-committing writer"""
+    
+    def __init__(self, path: Path, wal: bool = True, window_ms: float = 10.0, max_ops: int = 256):
+        self.path = path
+        self.wal = wal
+        self.window = window_ms / 1000
+        self.max_ops = max(1, max_ops)
+        self.stats = {'transactions': 0, 'writes': 0, 'failed': 0}
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue()
+        self._inflight = 0
+        self._inflight_lock = threading.Lock()
+        self._writer = self._connect()
+        self._thread = threading.Thread(target=self._run, name="vgob-sqlite", daemon=True)
+        self._thread.start()
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: the writer issues BEGIN/COMMIT itself; statements stay cached per connection
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False, cached_statements=256)
+        if self.wal:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def reader(self) -> sqlite3.Connection:
+        """This thread's read connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+    
+    def submit(self, fn, exclusive: bool = False) -> Future:
+        """Queue fn(conn) for the writer; exclusive ops run alone, outside a transaction"""
+        future = Future()
+        with self._inflight_lock:
+            self._inflight += 1
+        self._queue.put((fn, future, exclusive))
+        return future
+    
+    def pending(self) -> int:
+        """Writes queued or in a transaction that has not committed yet"""
+        return self._inflight
+    
+    def execute(self, sql: str, params=()) -> Future:
+        return self.submit(lambda conn: conn.execute(sql, params).rowcount)
+    
+    def executemany(self, sql: str, rows: List[Tuple]) -> Future:
+        return self.submit(lambda conn: conn.executemany(sql, rows).rowcount)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, queued=self._queue.qsize())
+    
+    def flush(self):
+        """Block until every write queued so far is committed"""
+        self.submit(lambda conn: None).result()
+    
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._writer.close()
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+    
+    def _run(self):
+        running = True
+        while running:
+            op = self._queue.get()
+            if op is None:
+                break
+            batch = [op]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_ops and not batch[-1][2]:
+                remaining = deadline - time.monotonic()
+                try:
+                    op = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if op is None:
+                    running = False
+                    break
+                batch.append(op)
+            
+            # Exclusive ops (VACUUM) close the batch and run on their own
+            if batch[-1][2]:
+                *grouped, exclusive = batch
+                self._commit(grouped)
+                self._run_exclusive(exclusive)
+            else:
+                self._commit(batch)
+            with self._inflight_lock:
+                self._inflight -= len(batch)
+    
+    def _commit(self, batch: List[Tuple]):
+        if not batch:
+            return
+        conn = self._writer
+        try:
+            conn.execute("BEGIN")
+            results = [fn(conn) for fn, _, _ in batch]
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            if len(batch) > 1:
+                # Retry one by one so a single bad write cannot sink its neighbours
+                for op in batch:
+                    self._commit([op])
+                return
+            self.stats['failed'] += 1
+            print(f"[{datetime.now().strftime('%H%M%S')}] SQLite write failed: {e}")
+            batch[0][1].set_exception(e)
+            return
+        self.stats['transactions'] += 1
+        self.stats['writes'] += len(batch)
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+    
+    def _run_exclusive(self, op: Tuple):
+        fn, future, _ = op
+        try:
+            future.set_result(fn(self._writer))
+        except Exception as e:
+            future.set_exception(e)
+
 class VectorMemoryStore:
     """Sophisticated vector memory with minimal interface"""
     
     def __init__(self, config: VectorGobConfig):
+        self._started = time.perf_counter()
         self.config = config
-        self.encoder = SentenceTransformer(config.model_name)
+        self.encoder = None
+        self.index = None
+        self.vector_log = None
         self.session_id = self._generate_session_id()
+        self.ready = threading.Event()
+        self.load_error: Optional[Exception] = None
+        self.startup_times: Dict[str, float] = {'module_import_s': MODULE_IMPORT_SECONDS}
+        self._lock = threading.RLock()
+        self._snapshot_lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._snapshot_thread = None
+        self.snapshot_count = 0
+        self._migration_thread = None
+        self._migration_pending = None
+        self.index_eval: Dict[str, Any] = {}
+        self._compaction_thread = None
+        self._stop = threading.Event()
+        self.retention_progress: Dict[str, Any] = {'state': 'idle', 'runs': 0, 'candidates': 0, 'deleted': 0, 'seconds': 0.0}
+        self.generation = 0
+        self._tail_index = None  # Readers: vectors the writer logged since the mapped generation
+        self._tail_log = None
+        self._own_writes = set()
+        self._tail_rowid = 0
+        
+        # Runtime state
+        self.memory_cache = RecentMemories(config.memory_limit)
+        self.partitions = LabelPartitions()  # Filtered-search candidates; readers query SQLite instead
+        self._partition_rowid = 0
+        self.memory_lru = LRUCache(config.memory_lru_size)
+        self.embedding_cache = LRUCache(config.embedding_cache_size)
+        self.embed_stats = {'cache_hits': 0, 'db_hits': 0, 'encoded': 0}
+        self._id_seq = 0
+        self.ingest_stats = IngestStats()
         
         # Initialize storage
+        self.index_path = Path(config.index_path)
+        self._writer_lock = None
+        if config.index_role == "writer":
+            self._writer_lock = open(self.index_path.with_name(self.index_path.name + ".lock"), 'w')
+            try:
+                fcntl.flock(self._writer_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._writer_lock.close()
+                raise RuntimeError(f"Another process is already the index writer for {self.index_path}")
         self._init_database()
-        self._load_or_create_index()
         
-        # Runtime state
-        self.memory_cache: List[Memory] = []
-        self._load_recent_memories()
+        # Writes always go through the collector, so callers never wait on warm-up or the encoder
+        self.batcher = EmbeddingBatcher(self, config.batch_window_ms, config.batch_max_size)
+        self._retention_thread = None
+        if config.retention_interval_s > 0 and self._retention_enabled():
+            self._retention_thread = threading.Thread(target=self._retention_loop, name="vgob-retention", daemon=True)
+            self._retention_thread.start()
+        self._generation_thread = None
+        if config.index_role in ("writer", "reader"):
+            self._generation_thread = threading.Thread(target=self._generation_loop, name="vgob-generations", daemon=True)
+            self._generation_thread.start()
+        
+        # Encoder and index: heavy, so optionally off the caller's thread
+        self._warmup_thread = None
+        if config.lazy_load:
+            self._warmup_thread = threading.Thread(target=self._warm_up, name="vgob-warmup", daemon=True)
+            self._warmup_thread.start()
+        else:
+            self._warm_up()
+            if self.load_error:
+                raise self.load_error
+    
+    def _warm_up(self):
+        """Import numpy/faiss, load the encoder and the index, then flip `ready`"""
+        try:
+            stage = time.perf_counter()
+            importlib.import_module("numpy")
+            importlib.import_module("faiss")
+            if self.config.encoder_backend != "hash" and not self.config.encoder_workers:
+                importlib.import_module("sentence_transformers")
+            self._blob_dtype = np.dtype(self.config.embedding_store_dtype)
+            self.startup_times['imports_s'] = time.perf_counter() - stage
+            
+            stage = time.perf_counter()
+            c = self.config
+            if c.encoder_workers:
+                self.encoder = EncoderPool(c.encoder_backend, c.model_name, c.vector_dim, c.encoder_workers, c.encoder_chunk_size)
+            else:
+                self.encoder = load_encoder(c.encoder_backend, c.model_name, c.vector_dim)
+            self.startup_times['encoder_s'] = time.perf_counter() - stage
+            
+            stage = time.perf_counter()
+            self._load_or_create_index()
+            self._load_recent_memories()
+            if self.config.index_role != "reader":
+                self._load_partitions()
+            self.startup_times['index_s'] = time.perf_counter() - stage
+            
+            self.startup_times['ready_s'] = time.perf_counter() - self._started
+            print(f"[{self._timestamp()}] Memory system ready in {self.startup_times['ready_s']:.2f}s "
+                  f"(imports {self.startup_times['imports_s']:.2f}s | encoder {self.startup_times['encoder_s']:.2f}s"
+                  f" | index {self.startup_times['index_s']:.2f}s)")
+        except Exception as e:
+            self.load_error = e
+            print(f"[{self._timestamp()}] Memory system failed to load: {e}")
+        finally:
+            self.ready.set()
+    
+    def _check_writable(self):
+        if self.config.index_role == "reader":
+            raise RuntimeError("Index is read-only in the reader role; rebuild and compact from the writer")
+    
+    def _wait_ready(self):
+        """Block until warm-up finishes; raise if it failed"""
+        self.ready.wait()
+        if self.load_error:
+            raise RuntimeError(f"Memory system unavailable: {self.load_error}")
     
+
     def _generate_session_id(self) -> str:
         """Generate unique session identifier"""
         timestamp = datetime.now(timezone.utc).strftime("%y%m%d_%H%M%S")
@@ -108,7 +1027,9 @@ class VectorMemoryStore:
         self.db_path = Path(self.config.db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with sqlite3.connect(self.db_path) as conn:
+        self.db = SQLiteStore(self.db_path, self.config.sqlite_wal, self.config.commit_window_ms, self.config.commit_max_ops)
+        
+        def create_schema(conn: sqlite3.Connection):
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS memories (
                     id TEXT PRIMARY KEY,
@@ -120,41 +1041,679 @@ class VectorMemoryStore:
                     embedding_hash TEXT
                 )
             """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    hash TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL
+                )
+            """)
             conn.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON memories(timestamp)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_session ON memories(session_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_context_type ON memories(context_type)")
+        
+        self.db.submit(create_schema).result()
     
     def _load_or_create_index(self):
         """Load existing FAISS index or create new one"""
-        self.index_path = Path(self.config.index_path)
+        if self.config.index_role == "reader":
+            self.index = self._new_index()  # Until the writer publishes a first generation
+            if self._open_generation():
+                print(f"[{self._timestamp()}] Mapped vector index generation {self.generation}: {self.index.ntotal} memories")
+            else:
+                print(f"[{self._timestamp()}] No published vector index yet, waiting for the writer")
+            return
         
-        if self.index_path.exists():
+        index_exists = self.index_path.exists()
+        if index_exists:
             self.index = faiss.read_index(str(self.index_path))
             print(f"[{self._timestamp()}] Loaded vector index: {self.index.ntotal} memories")
         else:
-            self.index = faiss.IndexFlatIP(self.config.vector_dim)  # Inner product (cosine sim)
+            self.index = self._new_index()
             print(f"[{self._timestamp()}] Created new vector index")
+        
+        # Replay vectors appended since the last snapshot
+        self.vector_log = None
+        self._last_snapshot = time.monotonic()
+        if self.config.index_persistence == "log" or self.config.index_role == "writer":
+            # Writers always log: rewriting the index file in place would change published generations under readers
+            self.vector_log = VectorLog(self.index_path.with_name(self.index_path.name + ".log"), self.config.vector_dim)
+            records = self.vector_log.open()
+            if not isinstance(self.index, faiss.IndexFlat):
+                tail = records[~np.isin(records['label'], index_labels(self.index))]
+                if len(tail):
+                    self.index.add_with_ids(np.ascontiguousarray(tail['vector']), np.ascontiguousarray(tail['label']))
+            else:
+                # Position-addressed legacy index: labels are row numbers
+                tail = records[records['label'] >= self.index.ntotal]
+                if len(tail) and tail['label'][0] != self.index.ntotal:
+                    print(f"[{self._timestamp()}] Vector log gap at {self.index.ntotal}, skipping {len(tail)} records")
+                    tail = tail[:0]
+                if len(tail):
+                    self.index.add(np.ascontiguousarray(tail['vector']))
+            if len(tail):
+                print(f"[{self._timestamp()}] Replayed vector log: {len(tail)} memories")
+        
+        if isinstance(self.index, faiss.IndexFlat):
+            self._migrate_legacy_index()
+        self._apply_search_params(self.index)
+        
+        if not index_exists and self.index.ntotal == 0:
+            if self.db.reader().execute("SELECT 1 FROM memories LIMIT 1").fetchone():
+                with self._rebuild_lock:
+                    self._rebuild_index()  # Still warming up, so not the public rebuild_index()
+        with self._lock:
+            self._maybe_migrate_index()  # e.g. vector_codec changed since the snapshot
+        
+        if self.config.index_role == "writer":
+            self.generation = self._read_generation()
+            self.snapshot_index()  # Readers start from everything replayed above
+    
+    def _new_index(self):
+        """Empty index keyed by memory label"""
+        return self._build_index(np.empty(0, np.int64), np.empty((0, self.config.vector_dim), np.float32),
+                                 self._target_layout(0))
+    
+    def _apply_search_params(self, index):
+        """Set query-time knobs, which are not tied to the persisted index"""
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            ivf.nprobe = self.config.ivf_nprobe
+        elif index_tier(index) == "hnsw":
+            faiss.downcast_index(index.index).hnsw.efSearch = self.config.hnsw_ef_search
+    
+    def _target_layout(self, n: int) -> Tuple[str, str]:
+        """(tier, codec) the index should have at n vectors; never steps back down once reached"""
+        c = self.config
+        tier, codec = index_layout(self.index) if self.index is not None else ("flat", "float32")
+        if c.index_policy in ("ivf", "hnsw") and (n >= c.ann_threshold or tier == c.index_policy):
+            tier = c.index_policy
+        else:
+            tier = "flat"
+        if c.vector_codec in TRAINED_CODECS and n < c.codec_train_size and codec != c.vector_codec:
+            codec = "float32"  # Not enough vectors to train on yet
+        else:
+            codec = c.vector_codec
+        if n < 256 and (tier == "ivf" or codec in TRAINED_CODECS):
+            return "flat", "float32" if codec in TRAINED_CODECS else codec  # Too few vectors to train at all
+        return tier, codec
+    
+    def _build_index(self, labels: np.ndarray, vectors: np.ndarray, layout: Tuple[str, str]):
+        """Train (if the layout needs it) and fill an index"""
+        d = self.config.vector_dim
+        tier, codec = layout
+        codes = VECTOR_CODECS[codec].format(pq_m=self.config.pq_m)
+        if tier == "hnsw":
+            index = faiss.index_factory(d, f"IDMap2,HNSW{self.config.hnsw_m},{codes}", faiss.METRIC_INNER_PRODUCT)
+            faiss.downcast_index(index.index).hnsw.efConstruction = self.config.hnsw_ef_construction
+        elif tier == "ivf":
+            nlist = self.config.ivf_nlist or int(min(65536, max(16, 4 * np.sqrt(len(vectors)))))
+            index = faiss.index_factory(d, f"IVF{nlist},{codes}", faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.index_factory(d, f"IDMap2,{codes}", faiss.METRIC_INNER_PRODUCT)
+        
+        if not index.is_trained:
+            train_size = max(self.config.codec_train_size, index.nlist * 256 if tier == "ivf" else 0)
+            sample = np.random.default_rng(0).choice(len(vectors), min(len(vectors), train_size), replace=False)
+            index.train(vectors[np.sort(sample)])
+        if tier == "ivf":
+            index.set_direct_map_type(faiss.DirectMap.Hashtable)  # reconstruct/remove by label
+        
+        for start in range(0, len(vectors), 65536):
+            index.add_with_ids(vectors[start:start + 65536], labels[start:start + 65536])
+        self._apply_search_params(index)
+        return index
+    
+    def _maybe_migrate_index(self):
+        """Start an online migration once the index outgrows its tier or codec (caller holds the lock)"""
+        if (self._target_layout(self.index.ntotal) != index_layout(self.index)
+                and not (self._migration_thread and self._migration_thread.is_alive())):
+            self._migration_thread = threading.Thread(target=self.migrate_index, name="vgob-migrate", daemon=True)
+            self._migration_thread.start()
+    
+    def migrate_index(self):
+        """Rebuild the index in its target layout without blocking writes"""
+        with self._rebuild_lock:
+            if self._target_layout(self.index.ntotal) == index_layout(self.index):
+                return
+            self._rebuild_index()
+        self.index_eval = self.evaluate_index(queries=50)
+    
+    def _swap_index(self, build, labels: np.ndarray):
+        """Install build()'s index, catching up with writes that landed while it ran"""
+        try:
+            index = build()
+            with self._lock:
+                for pending_labels, pending_vectors in self._migration_pending:
+                    fresh = ~np.isin(pending_labels, labels)
+                    if fresh.any():
+                        index.add_with_ids(np.ascontiguousarray(pending_vectors[fresh]), pending_labels[fresh])
+                self.index = index
+        finally:
+            with self._lock:
+                self._migration_pending = None
+        return index
+    
+    def rebuild_index(self):
+        """Rebuild the vector index from stored embeddings, encoding only rows that predate them"""
+        self._check_writable()
+        self._wait_ready()
+        with self._rebuild_lock:
+            self._rebuild_index()
+    
+    def _rebuild_index(self):
+        """rebuild_index() body; caller holds the rebuild lock"""
+        with self._lock:
+            self._migration_pending = []
+        started = time.perf_counter()
+        self.db.flush()
+        ids, vectors, stale = self._stored_vectors()
+        if stale:
+            stale_ids = [ids[i] for i in stale]
+            content = dict(self._select_in("SELECT id, content FROM memories WHERE id IN ({marks})", stale_ids))
+            embeddings, hashes = self.embed([content[memory_id] for memory_id in stale_ids])
+            vectors[stale] = embeddings
+            def backfill(conn: sqlite3.Connection):
+                self._insert_embeddings(conn, hashes, embeddings)
+                conn.executemany("UPDATE memories SET embedding_hash = ? WHERE id = ?", list(zip(hashes, stale_ids)))
+            self.db.submit(backfill).result()
+        labels = np.array([memory_label(memory_id) for memory_id in ids], dtype=np.int64)
+        
+        layout = self._target_layout(len(ids))
+        index = self._swap_index(lambda: self._build_index(labels, vectors, layout), labels)
+        print(f"[{self._timestamp()}] Rebuilt {'/'.join(layout)} vector index: {index.ntotal} memories "
+              f"({len(stale)} re-encoded) in {time.perf_counter() - started:.1f}s")
+        self.snapshot_index()
+    
+    def _stored_vectors(self) -> Tuple[List[str], np.ndarray, List[int]]:
+        """(ids, vectors, stale positions) for every memory in rowid order; stale rows have no stored embedding"""
+        rows = self.db.reader().execute("""
+            SELECT m.id, e.vector
+            FROM memories m LEFT JOIN embeddings e ON e.hash = m.embedding_hash
+            ORDER BY m.rowid
+        """).fetchall()
+        vectors = np.zeros((len(rows), self.config.vector_dim), np.float32)
+        stale = [i for i, (_, blob) in enumerate(rows) if blob is None]
+        present = np.setdiff1d(np.arange(len(rows)), stale)
+        if len(present):
+            vectors[present] = self._from_blobs([rows[i][1] for i in present])
+        return [row[0] for row in rows], vectors, stale
+    
+    def _retention_enabled(self) -> bool:
+        c = self.config
+        return c.index_role != "reader" and bool(c.retention_max_count or c.retention_max_age_days or c.retention_context_quotas or c.retention_session_quota)
+    
+    def _retention_loop(self):
+        self.ready.wait()
+        while not self._stop.wait(self.config.retention_interval_s):
+            self.start_compaction()
+    
+    def _retention_candidates(self, conn: sqlite3.Connection) -> List[str]:
+        """Ids violating any retention policy (newest memories are the ones kept)"""
+        c = self.config
+        ids = set()
+        if c.retention_max_age_days:
+            cutoff = datetime.now(timezone.utc).timestamp() - c.retention_max_age_days * 86400
+            ids.update(row[0] for row in conn.execute("SELECT id FROM memories WHERE timestamp < ?",
+                                                      (datetime.fromtimestamp(cutoff, timezone.utc).isoformat(),)))
+        if c.retention_max_count:
+            ids.update(row[0] for row in conn.execute(
+                "SELECT id FROM memories ORDER BY timestamp DESC LIMIT -1 OFFSET ?", (c.retention_max_count,)))
+        for context_type, quota in c.retention_context_quotas.items():
+            ids.update(row[0] for row in conn.execute(
+                "SELECT id FROM memories WHERE context_type = ? ORDER BY timestamp DESC LIMIT -1 OFFSET ?",
+                (context_type, quota)))
+        if c.retention_session_quota:
+            ids.update(row[0] for row in conn.execute("""
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY timestamp DESC) AS rank
+                    FROM memories
+                ) WHERE rank > ?
+            """, (c.retention_session_quota,)))
+        return sorted(ids)
+    
+    def start_compaction(self) -> bool:
+        """Run compact() on a background thread; False if one is already running"""
+        with self._lock:
+            if self._compaction_thread and self._compaction_thread.is_alive():
+                return False
+            self._compaction_thread = threading.Thread(target=self.compact, name="vgob-compact", daemon=True)
+            self._compaction_thread.start()
+            return True
+    
+    def compact(self) -> Dict[str, Any]:
+        """Apply retention policies: delete rows, drop their vectors and reclaim disk"""
+        self._check_writable()
+        self._wait_ready()
+        progress = self.retention_progress
+        started = time.perf_counter()
+        doomed = []
+        try:
+            with self._rebuild_lock:
+                progress.update(state='selecting', candidates=0, deleted=0)
+                self.db.flush()
+                doomed = self._retention_candidates(self.db.reader())
+                progress['candidates'] = len(doomed)
+            
+                if doomed:
+                    # Rows go in small transactions so writers interleave
+                    progress['state'] = 'deleting'
+                    for start in range(0, len(doomed), 500):
+                        chunk = doomed[start:start + 500]
+                        self.db.execute(f"DELETE FROM memories WHERE id IN ({','.join('?' * len(chunk))})", chunk).result()
+                        progress['deleted'] += len(chunk)
+                    self.db.execute("""
+                        DELETE FROM embeddings
+                        WHERE hash NOT IN (SELECT embedding_hash FROM memories WHERE embedding_hash IS NOT NULL)
+                    """).result()
+                
+                    progress['state'] = 'reindexing'
+                    labels = np.array([memory_label(memory_id) for memory_id in doomed], dtype=np.int64)
+                    with self._lock:
+                        self.memory_cache.remove(labels)
+                        self.partitions.remove(labels)
+                        for memory_id in doomed:
+                            self.memory_lru.discard(memory_id)
+                        self._own_writes.difference_update(doomed)
+                        tier = index_tier(self.index)
+                        removable = tier != "hnsw"  # HNSW graphs cannot drop nodes
+                        if removable:
+                            # IVF's hashtable direct map looks ids up one by one; flat scans with a hash set
+                            selector = faiss.IDSelectorArray(labels) if tier == "ivf" else faiss.IDSelectorBatch(labels)
+                            self.index.remove_ids(selector)
+                    if removable:
+                        self.snapshot_index()  # Also trims the purged vectors out of the log
+                    else:
+                        self._rebuild_index()
+                    
+                    if self.config.retention_vacuum:
+                        progress['state'] = 'vacuuming'
+                        self.db.submit(lambda conn: conn.execute("VACUUM"), exclusive=True).result()
+        finally:
+            progress.update(state='idle', runs=progress['runs'] + 1, seconds=time.perf_counter() - started)
+        if doomed:
+            print(f"[{self._timestamp()}] Compaction purged {len(doomed)} memories in {progress['seconds']:.1f}s")
+        return dict(progress)
+    
+    def evaluate_index(self, queries: int = 100, k: int = 10) -> Dict[str, Any]:
+        """Recall@k, latency and bytes per vector of the live index against exact stored vectors"""
+        self.db.flush()
+        ids, vectors, stale = self._stored_vectors()
+        with self._lock:
+            labels = np.array([memory_label(memory_id) for memory_id in ids], dtype=np.int64)
+            live = np.isin(labels, index_labels(self.index))
+            live[stale] = False
+            index_bytes = len(faiss.serialize_index(self.index))
+            ntotal = self.index.ntotal
+        labels, vectors = labels[live], vectors[live]
+        if not len(labels):
+            return {}
+        
+        k = min(k, len(labels))
+        sample = vectors[np.random.default_rng(1).choice(len(vectors), min(queries, len(vectors)), replace=False)]
+        baseline = faiss.IndexFlatIP(self.config.vector_dim)
+        baseline.add(vectors)
+        rerank = index_codec(self.index) != "float32" and self.config.rerank_factor > 0
+        
+        def timed_search(search):
+            latencies, rows = [], []
+            for query in sample:
+                started = time.perf_counter()
+                rows.append(search(query.reshape(1, -1)))
+                latencies.append((time.perf_counter() - started) * 1000)
+            return rows, np.array(latencies)
+        
+        def index_search(query, width=k):
+            with self._lock:
+                return self.index.search(query, min(width, self.index.ntotal))
+        
+        def reranked_search(query):
+            _, found = index_search(query, k * self.config.rerank_factor)
+            return self._rerank(query[0], found[0])[1][:k]
+        
+        exact_rows, flat_ms = timed_search(lambda query: baseline.search(query, k)[1][0])
+        found, index_ms = timed_search(lambda query: index_search(query)[1][0])
+        exact = [labels[row] for row in exact_rows]
+        recall = lambda rows: float(np.mean([len(np.intersect1d(e, f)) / k for e, f in zip(exact, rows)]))
+        
+        report = {
+            'index': index_tier(self.index),
+            'codec': index_codec(self.index),
+            'queries': len(sample),
+            'k': k,
+            'recall': recall(found),
+            'index_p50_ms': float(np.percentile(index_ms, 50)),
+            'index_p99_ms': float(np.percentile(index_ms, 99)),
+            'flat_p50_ms': float(np.percentile(flat_ms, 50)),
+            'flat_p99_ms': float(np.percentile(flat_ms, 99)),
+            'bytes_per_vector': index_bytes / max(ntotal, 1),
+            'float32_bytes_per_vector': self.config.vector_dim * 4 + 8,  # Flat codes plus the id map
+        }
+        report['compression'] = report['float32_bytes_per_vector'] / report['bytes_per_vector']
+        if rerank:
+            reranked, rerank_ms = timed_search(reranked_search)
+            report.update(recall_reranked=recall(reranked), rerank_p50_ms=float(np.percentile(rerank_ms, 50)),
+                          rerank_p99_ms=float(np.percentile(rerank_ms, 99)))
+        return report
+    
+    def _migrate_legacy_index(self):
+        """Re-key a position-addressed index by memory id (rows were added in rowid order)"""
+        vectors = self.index.reconstruct_n(0, self.index.ntotal) if self.index.ntotal else np.empty((0, self.config.vector_dim), np.float32)
+        # Legacy rows carry a hash of their vector bytes that joins to nothing in embeddings
+        rows = self.db.reader().execute("""
+            SELECT m.id, m.content, e.hash IS NULL
+            FROM memories m LEFT JOIN embeddings e ON e.hash = m.embedding_hash
+            ORDER BY m.rowid
+        """).fetchall()
+        ids = [row[0] for row in rows]
+        count = min(len(ids), len(vectors))
+        if count != len(vectors):
+            print(f"[{self._timestamp()}] Dropping {len(vectors) - count} vectors without a memory row")
+        
+        # The index vectors are theirs, so store them under the content hash for filtered search and re-ranking
+        stale = [i for i in range(count) if rows[i][2]]
+        if stale:
+            stale_ids = [ids[i] for i in stale]
+            hashes = [self.content_hash(rows[i][1]) for i in stale]
+            def backfill(conn: sqlite3.Connection):
+                self._insert_embeddings(conn, hashes, vectors[stale])
+                conn.executemany("UPDATE memories SET embedding_hash = ? WHERE id = ?", list(zip(hashes, stale_ids)))
+            self.db.submit(backfill).result()
+        
+        self.index = self._new_index()
+        if count:
+            self.index.add_with_ids(vectors[:count], np.array([memory_label(i) for i in ids[:count]], dtype=np.int64))
+        print(f"[{self._timestamp()}] Migrated vector index to memory ids: {count} memories ({len(stale)} embeddings backfilled)")
+        
+        faiss.write_index(self.index, str(self.index_path))
+        if self.vector_log:
+            self.vector_log.rewrite(np.empty(0, self.vector_log.dtype))
+    
+    def _add_to_index(self, labels: np.ndarray, embeddings: np.ndarray):
+        """Insert vectors, persist them and keep any running migration in step (caller holds the lock)"""
+        self.index.add_with_ids(embeddings, labels)
+        if self._migration_pending is not None:
+            self._migration_pending.append((labels, embeddings))
+        self._persist_index(labels, embeddings)
+        self._maybe_migrate_index()
+    
+    def _persist_index(self, labels: np.ndarray, embeddings: np.ndarray):
+        """Record vectors just added to the index (caller holds the lock)"""
+        if not self.vector_log:
+            faiss.write_index(self.index, str(self.index_path))
+            return
+        
+        self.vector_log.append(labels, embeddings)
+        
+        interval = self.config.snapshot_interval_s
+        due = self.vector_log.records >= self.config.snapshot_every or (
+            interval > 0 and time.monotonic() - self._last_snapshot >= interval)
+        if due and not (self._snapshot_thread and self._snapshot_thread.is_alive()):
+            self._last_snapshot = time.monotonic()
+            self._snapshot_thread = threading.Thread(target=self.snapshot_index, name="vgob-snapshot", daemon=True)
+            self._snapshot_thread.start()
+    
+    def snapshot_index(self):
+        """Write a full index snapshot and compact the vector log down to its tail"""
+        with self._snapshot_lock:
+            with self._lock:
+                data = faiss.serialize_index(self.index)
+                covered = self.vector_log.records if self.vector_log else 0
+            
+            # Disk write happens outside the lock so inserts keep flowing
+            tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(data.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.index_path)
+            
+            if self.vector_log:
+                with self._lock:
+                    self.vector_log.rewrite(self.vector_log.read()[covered:].copy())
+            self.snapshot_count += 1
+            if self.config.index_role == "writer":
+                self._publish_generation()
+    
+    def _generation_path(self, generation: int) -> Path:
+        return self.index_path.with_name(f"{self.index_path.name}.g{generation}")
+    
+    def _generation_log_path(self, generation: int) -> Path:
+        return self._generation_path(generation).with_name(f"{self._generation_path(generation).name}.log")
+    
+    def _read_generation(self) -> int:
+        """Generation the writer last published (0 = none yet)"""
+        try:
+            return int(self.index_path.with_name(self.index_path.name + ".current").read_text())
+        except (FileNotFoundError, ValueError):
+            return 0
+    
+    def _publish_generation(self):
+        """Expose the current snapshot to readers as an immutable generation file"""
+        generation = self.generation + 1
+        path = self._generation_path(generation)
+        path.unlink(missing_ok=True)  # Left over from a crashed writer
+        os.link(self.index_path, path)  # The snapshot was written to a fresh inode, so linking is free
+        if self.vector_log:
+            # The log was just compacted to a fresh inode too; it keeps growing until the next snapshot
+            log_path = self._generation_log_path(generation)
+            log_path.unlink(missing_ok=True)
+            os.link(self.vector_log.path, log_path)
+        
+        pointer = self.index_path.with_name(self.index_path.name + ".current")
+        tmp_path = pointer.with_name(pointer.name + ".tmp")
+        tmp_path.write_text(str(generation))
+        os.replace(tmp_path, pointer)
+        self.generation = generation
+        
+        # Readers keep whatever they mapped even once it is unlinked
+        for old in self.index_path.parent.glob(self.index_path.name + ".g*"):
+            suffix = old.name[len(self.index_path.name) + 2:].removesuffix(".log")
+            if suffix.isdigit() and int(suffix) <= generation - self.config.generation_keep:
+                old.unlink(missing_ok=True)
+    
+    def _open_generation(self) -> bool:
+        """Map the newest published generation if it changed; True if the index was swapped"""
+        generation = self._read_generation()
+        if not generation or generation == self.generation:
+            return False
+        flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+        index = faiss.read_index(str(self._generation_path(generation)), flags)
+        self._apply_search_params(index)
+        tail_index = self._build_index(np.empty(0, np.int64), np.empty((0, self.config.vector_dim), np.float32),
+                                       ("flat", "float32"))
+        with self._lock:
+            self.index = index
+            self.generation = generation
+            self._tail_index = tail_index
+            self._tail_log = VectorLog(self._generation_log_path(generation), self.config.vector_dim)
+        return True
+    
+    def _replay_generation_log(self):
+        """Add whatever the writer logged since the mapped generation to the tail index"""
+        if self._tail_log is None:
+            return
+        records = self._tail_log.read_since(self._tail_index.ntotal)
+        if len(records):
+            with self._lock:
+                self._tail_index.add_with_ids(np.ascontiguousarray(records['vector']),
+                                              np.ascontiguousarray(records['label']))
+    
+    def _generation_loop(self):
+        """Readers pick up new generations and the log tail since; the writer indexes memories that readers stored"""
+        self.ready.wait()
+        if self.load_error:
+            return
+        while not self._stop.wait(self.config.generation_interval_s):
+            try:
+                if self.config.index_role == "reader":
+                    self._open_generation()
+                    self._replay_generation_log()  # Snapshots only come every snapshot_every / snapshot_interval_s
+                    continue
+                self._tail_shared_writes()
+            except Exception as e:
+                print(f"[{self._timestamp()}] Index generation update failed: {e}")
+    
+    def _tail_shared_writes(self):
+        """Add rows other processes committed to the shared database to the index"""
+        if self.db.pending():
+            self.db.flush()
+        rows = self.db.reader().execute("""
+            SELECT rowid, id, session_id, context_type FROM memories WHERE rowid > ? ORDER BY rowid
+        """, (self._tail_rowid,)).fetchall()
+        if not rows:
+            return
+        self._tail_rowid = rows[-1][0]
+        with self._lock:
+            foreign = [row for row in rows if row[1] not in self._own_writes]
+            self._own_writes.difference_update(row[1] for row in rows)
+            fresh = [row for row in foreign if row[0] > self._partition_rowid]  # Older rows were loaded at warm-up
+            self.partitions.add([memory_label(row[1]) for row in fresh], [row[2] for row in fresh], [row[3] for row in fresh])
+            foreign = [row[1] for row in foreign]
+            if not foreign:
+                return
+            labels = np.array([memory_label(memory_id) for memory_id in foreign], dtype=np.int64)
+            missing = labels[~np.isin(labels, index_labels(self.index))]  # e.g. already picked up by a rebuild
+        if not len(missing):
+            return
+        
+        found = self._select_in("""
+            SELECT m.id, e.vector
+            FROM memories m JOIN embeddings e ON e.hash = m.embedding_hash
+            WHERE m.id IN ({marks})
+        """, [label_memory_id(int(label)) for label in missing])
+        if found:
+            labels = np.array([memory_label(row[0]) for row in found], dtype=np.int64)
+            with self._lock:
+                fresh = ~np.isin(labels, index_labels(self.index))
+                if fresh.any():
+                    self._add_to_index(labels[fresh], self._from_blobs([row[1] for row in found])[fresh])
+            print(f"[{self._timestamp()}] Indexed {int(fresh.sum())} memories stored by reader processes")
     
     def _load_recent_memories(self):
-        """Load recent memories into cache"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
+        """Load recent memories into cache; content stays in SQLite until asked for"""
+        rows = self.db.reader().execute("""
+            SELECT id, timestamp, context_type, session_id
+            FROM memories 
+            ORDER BY timestamp DESC 
+            LIMIT ?
+        """, (self.config.memory_limit,)).fetchall()[::-1]
+        
+        if rows:
+            self.memory_cache.add([memory_label(row[0]) for row in rows],
+                                  [datetime.fromisoformat(row[1]) for row in rows],
+                                  [row[3] for row in rows], [row[2] for row in rows])
+    
+    def _load_partitions(self):
+        """Group every stored label by session and context"""
+        rows = self.db.reader().execute("SELECT rowid, id, session_id, context_type FROM memories").fetchall()
+        if rows:
+            self.partitions.add([memory_label(row[1]) for row in rows], [row[2] for row in rows], [row[3] for row in rows])
+            self._partition_rowid = max(row[0] for row in rows)
+    
+    def recent_memories(self, limit: int = 10) -> List[Memory]:
+        """The newest cached memories, newest first"""
+        ids = [label_memory_id(label) for label in self.memory_cache.labels(limit)]
+        found = self.get_memories(ids)
+        return [found[memory_id] for memory_id in ids if memory_id in found]
+    
+    def _row_to_memory(self, row: Tuple) -> Memory:
+        """Build a Memory from an (id, timestamp, content, context_type, session_id, metadata) row"""
+        return Memory(
+            id=row[0],
+            timestamp=datetime.fromisoformat(row[1]),
+            content=row[2],
+            context_type=row[3],
+            session_id=row[4],
+            embedding=None,  # Will load on demand
+            metadata=json.loads(row[5]) if row[5] else {}
+        )
+    
+    def get_memories(self, memory_ids: List[str]) -> Dict[str, Memory]:
+        """Resolve ids through the LRU, fetching misses from SQLite in one query"""
+        found = {}
+        missing = []
+        with self._lock:
+            for memory_id in memory_ids:
+                memory = self.memory_lru.get(memory_id)
+                if memory is None:
+                    missing.append(memory_id)
+                else:
+                    found[memory_id] = memory
+        
+        if missing:
+            if self.db.pending():
+                self.db.flush()  # Rows still in the write-behind queue
+            fetched = self._select_in("""
                 SELECT id, timestamp, content, context_type, session_id, metadata
-                FROM memories 
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            """, (self.config.memory_limit,))
-            
-            for row in cursor:
-                memory = Memory(
-                    id=row[0],
-                    timestamp=datetime.fromisoformat(row[1]),
-                    content=row[2],
-                    context_type=row[3],
-                    session_id=row[4],
-                    embedding=None,  # Will load on demand
-                    metadata=json.loads(row[5]) if row[5] else {}
-                )
-                self.memory_cache.append(memory)
+                FROM memories
+                WHERE id IN ({marks})
+            """, missing)
+            with self._lock:
+                for row in fetched:
+                    memory = self._row_to_memory(row)
+                    self.memory_lru.put(memory.id, memory)
+                    found[memory.id] = memory
+        
+        return found
+    
+    def _select_in(self, sql: str, keys: List[str]) -> List[Tuple]:
+        """Run a `... IN ({marks})` query over keys in SQLite-sized chunks"""
+        rows = []
+        conn = self.db.reader()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows.extend(conn.execute(sql.format(marks=",".join("?" * len(chunk))), chunk))
+        return rows
+    
+    def content_hash(self, content: str) -> str:
+        """Embedding key: the content under the current encoder"""
+        encoder = self.config.model_name if self.config.encoder_backend != "hash" else f"hash:{self.config.vector_dim}"
+        return hashlib.md5(f"{encoder}\0{content}".encode()).hexdigest()[:16]
+    
+    def _to_blob(self, vector: np.ndarray) -> bytes:
+        return vector.astype(self._blob_dtype).tobytes()
+    
+    def _from_blob(self, blob: bytes) -> np.ndarray:
+        return np.frombuffer(blob, self._blob_dtype).astype(np.float32)
+    
+    def _from_blobs(self, blobs: List[bytes]) -> np.ndarray:
+        """Decode many BLOBs in one pass"""
+        return np.frombuffer(b"".join(blobs), self._blob_dtype).reshape(len(blobs), -1).astype(np.float32)
+    
+    def _insert_embeddings(self, conn: sqlite3.Connection, hashes: List[str], vectors: np.ndarray):
+        unique = dict(zip(hashes, vectors))
+        conn.executemany(INSERT_EMBEDDING_SQL, [(h, self._to_blob(v)) for h, v in unique.items()])
+    
+    def embed(self, texts: List[str]) -> Tuple[np.ndarray, List[str]]:
+        """Normalized embeddings and content hashes; only never-seen content reaches the encoder"""
+        hashes = [self.content_hash(text) for text in texts]
+        vectors = {}
+        with self._lock:
+            for h in hashes:
+                vector = self.embedding_cache.get(h)
+                if vector is not None:
+                    vectors[h] = vector
+        self.embed_stats['cache_hits'] += len(vectors)
+        
+        # Stored embeddings, then the encoder for whatever is left
+        missing = [h for h in dict.fromkeys(hashes) if h not in vectors]
+        loaded = {h: self._from_blob(blob) for h, blob in
+                  self._select_in("SELECT hash, vector FROM embeddings WHERE hash IN ({marks})", missing)} if missing else {}
+        self.embed_stats['db_hits'] += len(loaded)
+        
+        pending = {h: text for h, text in zip(hashes, texts) if h not in vectors and h not in loaded}
+        if pending:
+            encoded = np.asarray(self.encoder.encode(list(pending.values())), dtype=np.float32)
+            encoded = encoded / np.linalg.norm(encoded, axis=1, keepdims=True)  # Normalize for cosine similarity
+            loaded.update(zip(pending, encoded))
+            self.embed_stats['encoded'] += len(pending)
+        
+        with self._lock:
+            for h, vector in loaded.items():
+                self.embedding_cache.put(h, vector)
+        vectors.update(loaded)
+        
+        return np.stack([vectors[h] for h in hashes]), hashes
     
     def _timestamp(self) -> str:
         """Consistent timestamp format"""
@@ -162,81 +1721,339 @@ class VectorMemoryStore:
     
     def store_memory(self, content: str, context_type: str, metadata: Dict[str, Any] = None) -> str:
         """Store new memory with vector embedding"""
-        # Generate embedding
-        embedding = self.encoder.encode([content])[0]
-        embedding = embedding / np.linalg.norm(embedding)  # Normalize for cosine similarity
-        
-        # Create memory record
-        memory_id = hashlib.md5(f"{content}{datetime.now().timestamp()}".encode()).hexdigest()[:12]
-        memory = Memory(
-            id=memory_id,
-            timestamp=datetime.now(timezone.utc),
-            content=content,
-            embedding=embedding,
-            context_type=context_type,
-            session_id=self.session_id,
-            metadata=metadata or {}
-        )
+        return self.submit_memory(content, context_type, metadata).result()
+    
+    def submit_memory(self, content: str, context_type: str, metadata: Dict[str, Any] = None) -> Future:
+        """Queue a memory without waiting; the future resolves to its id"""
+        return self.batcher.submit(content, context_type, metadata)
+    
+    def store_memories(self, batch: List[Tuple[str, str, Optional[Dict[str, Any]]]]) -> List[str]:
+        """Store (content, context_type, metadata) tuples with a single encode() pass"""
+        if not batch:
+            return []
+        self._wait_ready()
         
-        # Store in database
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO memories (id, timestamp, content, context_type, session_id, metadata, embedding_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
+        # Generate embeddings in one forward pass (cached content skips the encoder)
+        started = time.perf_counter()
+        embeddings, hashes = self.embed([content for content, _, _ in batch])
+        encode_seconds = time.perf_counter() - started
+        
+        with self._lock:
+            # Create memory records
+            memories = []
+            for (content, context_type, metadata), embedding in zip(batch, embeddings):
+                self._id_seq += 1
+                memory_id = hashlib.md5(f"{content}{datetime.now().timestamp()}{self._id_seq}".encode()).hexdigest()[:12]
+                memories.append(Memory(
+                    id=memory_id,
+                    timestamp=datetime.now(timezone.utc),
+                    content=content,
+                    embedding=embedding,
+                    context_type=context_type,
+                    session_id=self.session_id,
+                    metadata=metadata or {}
+                ))
+            
+            # Store in database (write-behind: group-committed with other queued writes)
+            rows = [(
                 memory.id,
                 memory.timestamp.isoformat(),
                 memory.content,
                 memory.context_type,
                 memory.session_id,
                 json.dumps(memory.metadata),
-                hashlib.md5(embedding.tobytes()).hexdigest()[:16]
-            ))
+                embedding_hash
+            ) for memory, embedding_hash in zip(memories, hashes)]
+            
+            def write_rows(conn: sqlite3.Connection):
+                self._insert_embeddings(conn, hashes, embeddings)
+                conn.executemany(INSERT_MEMORY_SQL, rows)
+            self.db.submit(write_rows)
+            
+            # Add to caches
+            self.memory_cache.add([memory_label(m.id) for m in memories], [m.timestamp for m in memories],
+                                  [m.session_id for m in memories], [m.context_type for m in memories])
+            if self.config.index_role != "reader":
+                self.partitions.add([memory_label(m.id) for m in memories], [m.session_id for m in memories],
+                                    [m.context_type for m in memories])
+            for memory in memories:
+                self.memory_lru.put(memory.id, memory)
+            
+            # Add to vector index; readers leave that to the writer, which tails the shared database
+            if self.config.index_role != "reader":
+                if self.config.index_role == "writer":
+                    self._own_writes.update(memory.id for memory in memories)
+                labels = np.array([memory_label(memory.id) for memory in memories], dtype=np.int64)
+                self._add_to_index(labels, embeddings)
+            
+            self.ingest_stats.record(len(memories), encode_seconds)
         
-        # Add to vector index
-        self.index.add(embedding.reshape(1, -1))
+        return [memory.id for memory in memories]
+    
+    def close(self):
+        """Flush queued writes and stop background workers"""
+        self._stop.set()
+        if self._warmup_thread:
+            self._warmup_thread.join()
+        if self._retention_thread:
+            self._retention_thread.join()
+        if self._compaction_thread:
+            self._compaction_thread.join()
+        if self._generation_thread:
+            self._generation_thread.join()
+        if self.batcher:
+            self.batcher.close()
+            self.batcher = None
+        if self._migration_thread:
+            self._migration_thread.join()
+        if self._snapshot_thread:
+            self._snapshot_thread.join()
+        if self.vector_log:
+            if self.vector_log.records:
+                self.snapshot_index()
+            self.vector_log.close()
+        self.db.close()
+        if isinstance(self.encoder, EncoderPool):
+            self.encoder.close()
+        if self._writer_lock:
+            self._writer_lock.close()  # Releases the flock for the next writer
+    
+    def search_memories(self, query: str, limit: int = None, session_id: str = None, context_type: str = None,
+                        since: datetime = None, until: datetime = None) -> List[Tuple[Memory, float]]:
+        """Search memories by semantic similarity, optionally only those matching every given filter"""
+        self._wait_ready()
+        if self._searchable() == 0:
+            return []
+        return self.search_by_vector(self.embed([query])[0][0], limit, session_id, context_type, since, until)
+    
+    def search_by_vector(self, query_embedding: np.ndarray, limit: int = None, session_id: str = None,
+                         context_type: str = None, since: datetime = None,
+                         until: datetime = None) -> List[Tuple[Memory, float]]:
+        """search_memories() for an already encoded, normalized query"""
+        self._wait_ready()
+        if self._searchable() == 0:
+            return []
         
-        # Add to cache
-        self.memory_cache.insert(0, memory)
-        if len(self.memory_cache) > self.config.memory_limit:
-            self.memory_cache.pop()
+        limit = limit or self.config.context_memories
         
-        # Persist index
-        faiss.write_index(self.index, str(self.index_path))
+        # Search index, over-fetching when quantized scores get re-ranked
+        rerank = self.config.rerank_factor > 0 and index_codec(self.index) != "float32"
+        width = limit * self.config.rerank_factor if rerank else limit
+        where, params = self._filter_clause(session_id, context_type, since, until)
+        if where:
+            candidates = None
+            if self.config.index_role != "reader" and not (since or until):
+                with self._lock:
+                    candidates = self.partitions.labels(session_id, context_type)
+            similarities, labels, exact = self._filtered_search(query_embedding, width, where, params, candidates)
+            rerank = rerank and not exact
+        else:
+            with self._lock:
+                similarities, labels = self._search(query_embedding.reshape(1, -1), min(width, self._searchable()))
+            similarities, labels = similarities[0], labels[0]
+        if rerank:
+            similarities, labels = self._rerank(query_embedding, labels)
+        
+        # Filter by threshold, then hydrate hits by id
+        hits = [(label_memory_id(int(label)), float(sim)) for sim, label in zip(similarities[:limit], labels[:limit])
+                if label >= 0 and sim >= self.config.similarity_threshold]
+        memories = self.get_memories([memory_id for memory_id, _ in hits])
         
-        return memory_id
+        return [(memories[memory_id], sim) for memory_id, sim in hits if memory_id in memories]
     
-    def search_memories(self, query: str, limit: int = None) -> List[Tuple[Memory, float]]:
-        """Search memories by semantic similarity"""
-        if self.index.ntotal == 0:
+    def search_memories_batch(self, queries: List[str], limit: int = None) -> List[List[Tuple[Memory, float]]]:
+        """search_memories() for many queries: one encode pass, one multi-row search, one hydration query"""
+        self._wait_ready()
+        if not queries:
             return []
+        if self._searchable() == 0:
+            return [[] for _ in queries]
+        return self.search_by_vectors(self.embed(queries)[0], limit)
+    
+    def search_by_vectors(self, query_embeddings: np.ndarray, limit: int = None) -> List[List[Tuple[Memory, float]]]:
+        """search_memories_batch() for an already encoded (queries, dim) matrix"""
+        self._wait_ready()
+        if self._searchable() == 0:
+            return [[] for _ in query_embeddings]
         
         limit = limit or self.config.context_memories
+        rerank = self.config.rerank_factor > 0 and index_codec(self.index) != "float32"
+        with self._lock:
+            width = min(limit * self.config.rerank_factor if rerank else limit, self._searchable())
+            similarities, labels = self._search(np.ascontiguousarray(query_embeddings, dtype=np.float32), width)
+        if rerank:
+            similarities, labels = self._rerank_batch(query_embeddings, labels)
         
-        # Encode query
-        query_embedding = self.encoder.encode([query])[0]
-        query_embedding = query_embedding / np.linalg.norm(query_embedding)
+        # Threshold and truncate as masks, then hydrate every surviving id at once
+        keep = (labels >= 0) & (similarities >= self.config.similarity_threshold)
+        keep[:, limit:] = False
+        rows, cols = np.nonzero(keep)
+        hit_ids = [label_memory_id(label) for label in labels[rows, cols].tolist()]
+        memories = self.get_memories(list(dict.fromkeys(hit_ids)))
         
-        # Search index
-        similarities, indices = self.index.search(query_embedding.reshape(1, -1), min(limit * 2, self.index.ntotal))
+        results = [[] for _ in range(len(labels))]
+        for row, memory_id, sim in zip(rows.tolist(), hit_ids, similarities[rows, cols].tolist()):
+            if memory_id in memories:
+                results[row].append((memories[memory_id], sim))
+        return results
+    
+    def _searchable(self) -> int:
+        """Vectors a search can reach: the index plus a reader's log tail"""
+        return self.index.ntotal + (self._tail_index.ntotal if self._tail_index is not None else 0)
+    
+    def _search(self, queries: np.ndarray, k: int, params=None) -> Tuple[np.ndarray, np.ndarray]:
+        """index.search(), merged with the reader's log tail when it has one (caller holds the lock)"""
+        similarities, labels = self.index.search(queries, k, params=params)
+        tail = self._tail_index
+        if tail is None or not tail.ntotal:
+            return similarities, labels
+        tail_params = faiss.SearchParameters(sel=params.sel) if params is not None else None
+        tail_similarities, tail_labels = tail.search(queries, min(k, tail.ntotal), params=tail_params)
+        similarities, labels = np.hstack([similarities, tail_similarities]), np.hstack([labels, tail_labels])
+        best = np.argsort(-similarities, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(similarities, best, axis=1), np.take_along_axis(labels, best, axis=1)
+    
+    def _filter_clause(self, session_id: str = None, context_type: str = None,
+                       since: datetime = None, until: datetime = None) -> Tuple[str, List[Any]]:
+        """SQL predicate over memories for the given filters ('' when unfiltered)"""
+        clauses, params = [], []
+        if session_id:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        if context_type:
+            clauses.append("context_type = ?")
+            params.append(context_type)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since.astimezone(timezone.utc).isoformat())
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(until.astimezone(timezone.utc).isoformat())
+        return " AND ".join(clauses), params
+    
+    def _filtered_search(self, query: np.ndarray, k: int, where: str, params: List[Any],
+                         labels: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """Top-k among memories matching `where` (or among `labels`, when the caller already has them);
+        the flag is True when scores are already exact"""
+        if labels is None:
+            if self.db.pending():
+                self.db.flush()  # Matching rows may still be in the write-behind queue
+            ids = [row[0] for row in self.db.reader().execute(f"SELECT id FROM memories WHERE {where}", params)]
+            labels = np.array([memory_label(memory_id) for memory_id in ids], dtype=np.int64)
+        k = min(k, len(labels))
         
-        # Filter by threshold and return with memories
-        results = []
-        for sim, idx in zip(similarities[0], indices[0]):
-            if sim >= self.config.similarity_threshold and idx < len(self.memory_cache):
-                memory = self.memory_cache[idx]
-                results.append((memory, float(sim)))
+        # Large partitions: the index only visits matching labels
+        if k and len(labels) > self.config.filter_exact_max:
+            selector = faiss.IDSelectorBatch(labels)
+            tier = index_tier(self.index)
+            if tier == "ivf":
+                search_params = faiss.SearchParametersIVF(sel=selector, nprobe=self.config.ivf_nprobe)
+            elif tier == "hnsw":
+                search_params = faiss.SearchParametersHNSW(sel=selector, efSearch=max(self.config.hnsw_ef_search, k))
+            else:
+                search_params = faiss.SearchParameters(sel=selector)
+            try:
+                with self._lock:
+                    similarities, found = self._search(query.reshape(1, -1), k, search_params)
+            except RuntimeError:
+                pass  # Flat PQ has no selector support
+            else:
+                # Probed lists / graph walks can come back short when matches are sparse
+                if (found[0] >= 0).sum() == k:
+                    return similarities[0], found[0], False
         
-        return results[:limit]
+        # Small partitions (or no selector support): score every match against its stored vector
+        similarities, labels = self._rerank(query, labels)
+        return similarities[:k], labels[:k], True
+    
+    def _rerank(self, query: np.ndarray, labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Re-score candidate labels against their stored full-precision vectors, best first"""
+        similarities, labels = self._rerank_batch(query.reshape(1, -1), labels.reshape(1, -1))
+        found = labels[0] >= 0  # Unscored candidates sort last
+        return similarities[0][found], labels[0][found]
+    
+    def _rerank_batch(self, queries: np.ndarray, labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """_rerank() for a (queries, candidates) label matrix; rows without a stored vector become -1 / -inf"""
+        wanted = np.unique(labels[labels >= 0])
+        if self.db.pending():
+            self.db.flush()  # Candidates may still be in the write-behind queue
+        rows = self._select_in("""
+            SELECT m.id, e.vector
+            FROM memories m JOIN embeddings e ON e.hash = m.embedding_hash
+            WHERE m.id IN ({marks})
+        """, [label_memory_id(int(label)) for label in wanted])
+        stored = np.array([memory_label(row[0]) for row in rows], dtype=np.int64)
+        vectors = self._from_blobs([row[1] for row in rows]) if rows else np.empty((0, queries.shape[1]), np.float32)
+        
+        # Rows that predate stored embeddings: the index still has their vectors
+        missing = np.setdiff1d(wanted, stored)
+        if len(missing):
+            recovered, recovered_vectors = self._reconstruct(missing)
+            stored = np.concatenate([stored, recovered])
+            vectors = np.concatenate([vectors, recovered_vectors])
+        if not len(stored):
+            return np.full(labels.shape, -np.inf, np.float32), np.full_like(labels, -1)
+        
+        # Look every candidate up in the fetched rows, then score all of them in one einsum
+        order = np.argsort(stored)
+        stored, vectors = stored[order], vectors[order]
+        positions = np.minimum(np.searchsorted(stored, labels), len(stored) - 1)
+        found = (labels >= 0) & (stored[positions] == labels)
+        similarities = np.einsum("nkd,nd->nk", vectors[positions], queries)
+        similarities[~found] = -np.inf
+        
+        ranked = np.argsort(-similarities, axis=1, kind="stable")
+        return (np.take_along_axis(similarities, ranked, axis=1),
+                np.take_along_axis(np.where(found, labels, -1), ranked, axis=1))
+    
+    def _reconstruct(self, labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(labels, vectors) the index can decode; lossy for quantized codecs, better than no score at all"""
+        found, vectors = [], []
+        with self._lock:
+            for label in labels.tolist():
+                try:
+                    vectors.append(self.index.reconstruct(label))
+                except RuntimeError:
+                    continue  # Not in the index, or a layout without a direct map
+                found.append(label)
+        if not found:
+            return np.empty(0, np.int64), np.empty((0, self.config.vector_dim), np.float32)
+        return np.array(found, dtype=np.int64), np.vstack(vectors).astype(np.float32)
     
     def get_memory_stats(self) -> Dict[str, Any]:
         """Get memory system statistics"""
+        if not self.ready.is_set() or self.load_error:
+            return {
+                'ready': False,
+                'load_error': str(self.load_error) if self.load_error else None,
+                'warming_s': time.perf_counter() - self._started,
+                'session_id': self.session_id,
+                'vector_dim': self.config.vector_dim,
+                'startup': dict(self.startup_times)
+            }
+        with self._lock:
+            recent = self.memory_cache.stats(self.session_id)
         return {
-            'total_memories': self.index.ntotal,
-            'session_memories': len([m for m in self.memory_cache if m.session_id == self.session_id]),
-            'cache_size': len(self.memory_cache),
+            'ready': True,
+            'startup': dict(self.startup_times),
+            'total_memories': self._searchable(),
+            'session_memories': recent['session'],
+            'cache_size': recent['size'],
+            'recent': recent,
+            'lru_size': len(self.memory_lru),
             'session_id': self.session_id,
-            'vector_dim': self.config.vector_dim
+            'vector_dim': self.config.vector_dim,
+            'index': index_tier(self.index),
+            'codec': index_codec(self.index),
+            'role': self.config.index_role,
+            'generation': self.generation,
+            'index_eval': self.index_eval,
+            'ingest': self.ingest_stats.to_dict(),
+            'embedding_cache': dict(self.embed_stats, size=len(self.embedding_cache)),
+            'log_records': self.vector_log.records if self.vector_log else 0,
+            'snapshots': self.snapshot_count,
+            'retention': dict(self.retention_progress),
+            'sqlite': self.db.get_stats()
         }
 
 # =============================================================================
@@ -250,7 +2067,12 @@ class VectorGOB:
         self.config = config or VectorGobConfig()
         self.memory = VectorMemoryStore(self.config)
         self.api_key = os.getenv("OPENROUTER_API_KEY")
-        self.current_acronym = np.random.choice(self.config.acronyms)
+        self.current_acronym = random.choice(self.config.acronyms)
+        self.turn_stats = TurnStats()
+        self.response_cache = None
+        if self.config.response_cache:
+            self.response_cache = ResponseCache(self.config.response_cache_threshold,
+                                                self.config.response_cache_ttl_s, self.config.response_cache_size)
         
         if not self.api_key:
             raise ValueError("OPENROUTER_API_KEY environment variable required")
@@ -260,10 +2082,8 @@ class VectorGOB:
         timestamp = datetime.now().strftime(self.config.timestamp_format)
         print(f"[{timestamp}] {message}")
     
-    def _build_context_from_memory(self, user_input: str) -> str:
+    def _build_context_from_memory(self, relevant_memories: List[Tuple[Memory, float]]) -> str:
         """Build context string from relevant memories"""
-        relevant_memories = self.memory.search_memories(user_input)
-        
         if not relevant_memories:
             return ""
         
@@ -275,8 +2095,9 @@ class VectorGOB:
         
         return "\n".join(context_lines)
     
-    def _call_api(self, messages: List[Dict[str, str]]) -> str:
-        """Call OpenRouter API with clean error handling"""
+    def _call_api(self, messages: List[Dict[str, str]], on_delta: Callable[[str], None] = None) -> Tuple[str, Optional[str]]:
+        """Stream a completion from OpenRouter, passing each chunk to on_delta.
+        Returns (text received, error marker or None); a stream that fails partway returns both."""
         url = "https://openrouter.ai/api/v1/chat/completions"
         headers = {"Authorization": f"Bearer {self.api_key}"}
         
@@ -284,23 +2105,53 @@ class VectorGOB:
             "model": self.config.openai_model,
             "messages": messages,
             "temperature": self.config.temperature,
-            "max_tokens": self.config.max_tokens
+            "max_tokens": self.config.max_tokens,
+            "stream": True
         }
         
+        parts = []
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
-        except requests.exceptions.RequestException as e:
-            return f"// API_ERROR: {str(e)[:50]}..."
+            with requests.post(url, json=payload, headers=headers, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                for delta in sse_deltas(response):
+                    parts.append(delta)
+                    if on_delta:
+                        on_delta(delta)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            error = f"// API_ERROR: {str(e)[:50]}..."
+            if on_delta:
+                on_delta(f" {error}" if parts else error)
+            return "".join(parts), error
+        return "".join(parts), None
     
-    def chat(self, user_input: str) -> str:
-        """Process user input with vector memory context"""
-        # Store user input in memory
-        self.memory.store_memory(user_input, "user_input")
+    def chat(self, user_input: str, on_delta: Callable[[str], None] = None) -> str:
+        """Process user input with vector memory context; on_delta receives the reply as it streams"""
+        # Encode once and search with that vector (memory features switch on once the encoder is warm)
+        memory_context = ""
+        query_embedding = None
+        if self.memory.ready.is_set() and not self.memory.load_error:
+            started = time.perf_counter()
+            query_embedding = self.memory.embed([user_input])[0][0]
+            self.turn_stats.record('encode', time.perf_counter() - started)
+            
+            # A near-repeat of a recent prompt skips search and the API entirely
+            if self.response_cache is not None:
+                cached = self.response_cache.get(query_embedding, self._fingerprint())
+                if cached is not None:
+                    if on_delta:
+                        on_delta(cached)
+                    self._persist(user_input, "user_input")
+                    self._persist(cached, "bot_response")
+                    self.turn_stats.turns += 1
+                    return cached
+            
+            started = time.perf_counter()
+            relevant_memories = self.memory.search_by_vector(query_embedding)
+            self.turn_stats.record('search', time.perf_counter() - started)
+            memory_context = self._build_context_from_memory(relevant_memories)
         
-        # Build context from similar memories
-        memory_context = self._build_context_from_memory(user_input)
+        # Store user input only now, so it cannot match itself; the vector above comes back from the embedding cache
+        self._persist(user_input, "user_input")
         
         # Construct system prompt with identity
         system_content = f"{self.config.system_prompt}\n\nCurrent identity: {self.current_acronym}"
@@ -314,27 +2165,101 @@ class VectorGOB:
         ]
         
         # Get response
-        response = self._call_api(messages)
+        started = time.perf_counter()
+        first_token = []
+        def relay(delta: str):
+            if not first_token:
+                first_token.append(time.perf_counter() - started)
+            if on_delta:
+                on_delta(delta)
+        response, error = self._call_api(messages, relay)
+        llm_seconds = time.perf_counter() - started
+        self.turn_stats.record('llm', llm_seconds)
+        if first_token:
+            self.turn_stats.record('first_token', first_token[0])
+        self.turn_stats.turns += 1
+        if error:
+            # A failed or truncated reply is shown, but never cached or remembered
+            return f"{response} {error}" if response else error
+        if self.response_cache is not None and query_embedding is not None:
+            self.response_cache.put(query_embedding, self._fingerprint(), response, llm_seconds)
         
-        # Store response in memory
-        self.memory.store_memory(response, "bot_response")
+        # Store response in memory off the response path
+        self._persist(response, "bot_response")
         
         return response
     
+    def _fingerprint(self) -> str:
+        """What a cached reply depends on besides the prompt (memory context deliberately excluded)"""
+        c = self.config
+        return hashlib.md5(f"{c.openai_model}\0{c.temperature}\0{c.max_tokens}\0{c.system_prompt}\0{self.current_acronym}".encode()).hexdigest()
+    
+    def invalidate_response_cache(self, fingerprint: str = None) -> int:
+        """Forget cached replies (all, or one fingerprint's); returns how many were dropped"""
+        return self.response_cache.invalidate(fingerprint) if self.response_cache is not None else 0
+    
+    def _persist(self, content: str, context_type: str):
+        """Queue a memory write; its latency is recorded once the write-behind queue lands it"""
+        started = time.perf_counter()
+        def done(future: Future):
+            if not future.exception():
+                self.turn_stats.record('persist', time.perf_counter() - started)
+        self.memory.submit_memory(content, context_type).add_done_callback(done)
+    
     def status(self) -> str:
         """System status in terminal style"""
         stats = self.memory.get_memory_stats()
         uptime = datetime.now().strftime("%H:%M:%S")
         
-        return f"""// VECTOR_GOB_STATUS
+        if not stats['ready']:
+            state = f"load_failed: {stats['load_error']}" if stats['load_error'] else f"warming ({stats['warming_s']:.1f}s)"
+            return f"""// VECTOR_GOB_STATUS
+// uptime: {uptime} | identity: {self.current_acronym}
+// memory: {state} | chat available without memory context
+// encoder: {self.config.model_name} | session_id: {stats['session_id']}"""
+        
+        startup = stats['startup']
+        role = stats['role'] if stats['role'] == 'private' else f"{stats['role']}@g{stats['generation']}"
+        status = f"""// VECTOR_GOB_STATUS
 // uptime: {uptime} | identity: {self.current_acronym}
 // vector_memories: {stats['total_memories']} | session_memories: {stats['session_memories']}
-// cache_size: {stats['cache_size']} | vector_dim: {stats['vector_dim']}
+// cache_size: {stats['cache_size']} | vector_dim: {stats['vector_dim']} | index: {stats['index']}/{stats['codec']}
+// ingest_batches: {stats['ingest']['batches']} | avg_batch: {stats['ingest']['avg_batch']:.1f} | encode_rate: {stats['ingest']['encode_per_sec']:.0f}/s
+// embed_cache: {stats['embedding_cache']['cache_hits']} hits | {stats['embedding_cache']['db_hits']} stored | {stats['embedding_cache']['encoded']} encoded
+// sqlite: {stats['sqlite']['writes']} writes in {stats['sqlite']['transactions']} commits | queued: {stats['sqlite']['queued']}
 // encoder: {self.config.model_name} | similarity_threshold: {self.config.similarity_threshold}
-// session_id: {stats['session_id']}"""
+// session_id: {stats['session_id']} | index_role: {role}
+// startup: ready {startup['ready_s']:.2f}s | encoder {startup['encoder_s']:.2f}s | index {startup['index_s']:.2f}s"""
+        
+        turn = self.turn_stats.to_dict()
+        if turn['turns']:
+            avg = turn['avg_ms']
+            status += (f"\n// turn_avg_ms: encode {avg.get('encode', 0):.1f} | search {avg.get('search', 0):.1f}"
+                       f" | llm {avg.get('llm', 0):.0f} (first token {avg.get('first_token', 0):.0f})"
+                       f" | persist {avg.get('persist', 0):.1f} | turns: {turn['turns']}")
+        if self.response_cache is not None:
+            cache = self.response_cache.stats
+            lookups = cache['hits'] + cache['misses']
+            status += (f"\n// response_cache: {cache['hits']}/{lookups} hits"
+                       f" ({cache['hits'] / lookups if lookups else 0:.0%}) | saved: {cache['saved_s']:.1f}s"
+                       f" | entries: {len(self.response_cache)}")
+        
+        retention = stats['retention']
+        if retention['runs'] or retention['state'] != 'idle':
+            status += (f"\n// retention: {retention['state']} | runs: {retention['runs']}"
+                       f" | purged: {retention['deleted']}/{retention['candidates']}")
+        ev = stats['index_eval']
+        if ev:
+            status += (f"\n// index_recall@{ev['k']}: {ev['recall']:.3f} | p99: {ev['index_p99_ms']:.2f}ms"
+                       f" (flat {ev['flat_p99_ms']:.2f}ms)")
+            status += (f"\n// footprint: {ev['bytes_per_vector']:.0f} B/vector ({ev['compression']:.1f}x smaller than float32)"
+                       + (f" | reranked_recall: {ev['recall_reranked']:.3f}" if 'recall_reranked' in ev else ""))
+        return status
     
     def search(self, query: str) -> str:
         """Search memory with similarity scores"""
+        if not self.memory.ready.is_set():
+            return "// MEMORY_WARMING: encoder still loading, try again shortly"
         memories = self.memory.search_memories(query, limit=5)
         
         if not memories:
@@ -351,11 +2276,14 @@ class VectorGOB:
     def start_terminal(self):
         """Main terminal interface"""
         self._log(f"Vector GOB initialized | {self.current_acronym}")
-        self._log(f"Memory system ready | encoder: {self.config.model_name}")
+        if self.memory.ready.is_set():
+            self._log(f"Memory system ready | encoder: {self.config.model_name}")
+        else:
+            self._log(f"Memory system warming | encoder: {self.config.model_name}")
         
         print("\n" + "="*60)
         print("VECTOR GOB - Distributed Memory Terminal")
-        print("Commands: /status /search <query> /quit")
+        print("Commands: /status /search <query> /uncache /quit")
         print("="*60 + "\n")
         
         while True:
@@ -371,24 +2299,39 @@ class VectorGOB:
                     break
                 elif user_input == "/status":
                     print(self.status())
+                elif user_input == "/uncache":
+                    print(f"// RESPONSE_CACHE_CLEARED: {self.invalidate_response_cache()} replies")
                 elif user_input.startswith("/search "):
                     query = user_input[8:].strip()
                     print(self.search(query))
                 else:
-                    # Regular chat
-                    response = self.chat(user_input)
-                    print(f"\n{response}\n")
+                    # Regular chat, rendered as it streams
+                    print()
+                    self.chat(user_input, on_delta=lambda delta: print(delta, end="", flush=True))
+                    print("\n")
                     
             except KeyboardInterrupt:
                 print("\n// INTERRUPT_SIGNAL_RECEIVED")
                 break
             except Exception as e:
                 print(f"// ERROR: {str(e)}")
+        
+        self.memory.close()
 
 # =============================================================================
 # ENTRY POINT
 # =============================================================================
 
+def measure_startup(config: VectorGobConfig) -> Dict[str, float]:
+    """Cold-start timings: time until a prompt could show, and until memory is ready"""
+    started = time.perf_counter()
+    store = VectorMemoryStore(config)
+    timings = {'prompt_s': time.perf_counter() - started}
+    store.ready.wait()
+    timings.update(store.startup_times)
+    store.close()
+    return timings
+
 def main():
     """Launch Vector GOB terminal"""
     
@@ -400,6 +2343,10 @@ def main():
         context_memories=4
     )
     
+    if "--startup-time" in sys.argv[1:]:
+        print(json.dumps(measure_startup(config), indent=2))
+        return
+    
     try:
         bot = VectorGOB(config)
         bot.start_terminal()
@@ -4,8 +4,19 @@ import json
 from datetime import datetime
 import random
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+def _add_root(marker="toolkit"):
+    here=Path(__file__).resolve()
+    for parent in [here.parent] + list(here.parents):
+        if (parent/marker).exists() and str(parent) not in sys.path:
+            sys.path.append(str(parent)); return
+_add_root()
+
+from toolkit.sse import sse_deltas
+
 # Load environment variables from .env file at the project root
 dotenv_path = os.path.join(os.path.dirname(__file__), '..', '..', '.env')
 load_dotenv(dotenv_path=dotenv_path)
@@ -39,7 +50,7 @@ class ShortTermMemory:
 memory = ShortTermMemory(size=MEMORY_SIZE)
 SESSION_ACRONYM = random.choice(ACRONYMS)
 
-def chat_with_model(system_prompt, user_input, secondary_prompt, temperature):
+def stream_chat_with_model(system_prompt, user_input, secondary_prompt, temperature):
     url = "https://openrouter.ai/api/v1/chat/completions"
     headers = {"Authorization": f"Bearer {API_KEY}"}
     system_with_acronym = f"{system_prompt}\nCurrent identity: {SESSION_ACRONYM}"
@@ -54,10 +65,26 @@ def chat_with_model(system_prompt, user_input, secondary_prompt, temperature):
         {"role": "system", "content": full_secondary_prompt},
         {"role": "user", "content": user_input}
     ]
-    payload = {"model": MODEL_NAME, "messages": messages, "temperature": temperature}
-    response = requests.post(url, json=payload, headers=headers)
-    response.raise_for_status()
-    return response.json()["choices"][0]["message"]["content"]
+    payload = {"model": MODEL_NAME, "messages": messages, "temperature": temperature, "stream": True}
+    with requests.post(url, json=payload, headers=headers, stream=True) as response:
+        response.raise_for_status()
+        yield from sse_deltas(response)
+
+def chat_with_model(system_prompt, user_input, secondary_prompt, temperature):
+    return "".join(stream_chat_with_model(system_prompt, user_input, secondary_prompt, temperature))
+
+def stream_interface_chat(text, session_id, corr_id):
+    # Gateway entry point: a chat.output.delta event per chunk, then the full chat.output
+    from toolkit.events import new_event
+    meta = {"session_id": session_id, "corr_id": corr_id}
+    parts = []
+    for delta in stream_chat_with_model(SYSTEM_PROMPT, text, SECONDARY_PROMPT, TEMPERATURE):
+        parts.append(delta)
+        yield new_event("mesh.output", "mini", "chat.output.delta", {"text": delta, "seq": len(parts)}, meta=dict(meta))
+    reply = "".join(parts)
+    memory.add("user", text)
+    memory.add("assistant", reply)
+    yield new_event("mesh.output", "mini", "chat.output", {"text": reply}, meta=dict(meta))
 
 def load_nano_log(file_path):
     if os.path.exists(file_path):
@@ -81,11 +108,15 @@ def start_mini():
             if user_input.lower() in ["exit", "quit"]:
                 log("Exiting Mini GOB.")
                 break
-            reply = chat_with_model(SYSTEM_PROMPT, user_input, SECONDARY_PROMPT, TEMPERATURE)
-            memory.add("user", user_input)
-            memory.add("assistant", reply)
             log(f"You: {user_input}")
-            log(f"GOB: {reply}")
+            print(f"[{datetime.utcnow().isoformat()}] GOB: ", end="", flush=True)
+            parts = []
+            for delta in stream_chat_with_model(SYSTEM_PROMPT, user_input, SECONDARY_PROMPT, TEMPERATURE):
+                parts.append(delta)
+                print(delta, end="", flush=True)
+            print()
+            memory.add("user", user_input)
+            memory.add("assistant", "".join(parts))
         except KeyboardInterrupt:
             log("Exiting Mini GOB.")
             break
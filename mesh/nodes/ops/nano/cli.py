@@ -46,10 +46,20 @@ async def run():
             await client.close()
 
     async def printer():
+        streaming = set()  # corr_ids whose reply is being printed chunk by chunk
         async for ev in client.recv_outputs():
             payload = ev.payload or {}
             text = payload.get("text", "")
-            if text:
+            corr_id = ev.meta.get("corr_id")
+            if ev.topic == "chat.output.delta":
+                if corr_id not in streaming:
+                    streaming.add(corr_id)
+                    print(stylize("", channel="chat", session_id=client.session_id, corr_id=corr_id), end="", flush=True)
+                print(text, end="", flush=True)
+            elif ev.topic == "chat.output" and corr_id in streaming:
+                streaming.discard(corr_id)
+                _println("")  # Already on screen; just end the line
+            elif text:
                 _println(text)
 
     await asyncio.gather(reader(), printer())
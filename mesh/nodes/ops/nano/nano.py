@@ -3,8 +3,19 @@
 import requests
 from datetime import datetime
 import random
+import sys
+from pathlib import Path
 from nanoconfig import SYSTEM_PROMPT, API_KEY, MODEL_NAME, SECONDARY_PROMPT, TEMPERATURE, ACRONYMS
 
+def _add_root(marker="toolkit"):
+    here=Path(__file__).resolve()
+    for parent in [here.parent] + list(here.parents):
+        if (parent/marker).exists() and str(parent) not in sys.path:
+            sys.path.append(str(parent)); return
+_add_root()
+
+from toolkit.sse import sse_deltas
+
 # -----------------------------
 # Minimal Logger
 # -----------------------------
@@ -15,7 +26,7 @@ def log(msg):
 # -----------------------------
 # Chat function
 # -----------------------------
-def chat_with_model(system_prompt: str, user_input: str, secondary_prompt: str, temperature: float):
+def chat_with_model(system_prompt: str, user_input: str, secondary_prompt: str, temperature: float, on_delta=None):
     url = "https://openrouter.ai/api/v1/chat/completions"
     headers = {"Authorization": f"Bearer {API_KEY}"}
     
@@ -34,12 +45,19 @@ def chat_with_model(system_prompt: str, user_input: str, secondary_prompt: str,
     payload = {
         "model": MODEL_NAME,
         "messages": messages,
-        "temperature": temperature
+        "temperature": temperature,
+        "stream": True
     }
     
-    response = requests.post(url, json=payload, headers=headers)
-    response.raise_for_status()
-    return response.json()["choices"][0]["message"]["content"], chosen_acronym
+    # Stream the completion, handing each chunk to on_delta as it arrives
+    parts = []
+    with requests.post(url, json=payload, headers=headers, stream=True) as response:
+        response.raise_for_status()
+        for delta in sse_deltas(response):
+            parts.append(delta)
+            if on_delta:
+                on_delta(delta)
+    return "".join(parts), chosen_acronym
 
 # -----------------------------
 # Main Loop
@@ -55,11 +73,12 @@ def start_chat():
                 log("Exiting Nano GOB.")
                 break
 
-            reply, acronym = chat_with_model(SYSTEM_PROMPT, user_input, SECONDARY_PROMPT, TEMPERATURE)
-
-            # Log conversation
+            # Log conversation, printing the reply as it streams in
             log(f"You: {user_input}")
-            log(f"GOB ({acronym}): {reply}")
+            print(f"[{datetime.utcnow().isoformat()}] GOB: ", end="", flush=True)
+            reply, acronym = chat_with_model(SYSTEM_PROMPT, user_input, SECONDARY_PROMPT, TEMPERATURE,
+                                             on_delta=lambda delta: print(delta, end="", flush=True))
+            print(f"  ({acronym})")
 
         except KeyboardInterrupt:
             log("Exiting Nano GOB.")
@@ -2,8 +2,14 @@ import asyncio
 import json
 import os
 import sys
+import threading
+import time
+import statistics
+import multiprocessing
+import signal
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from dataclasses import asdict
 
 def _add_root(marker="toolkit"):
     here = Path(__file__).resolve()
@@ -13,25 +19,306 @@ def _add_root(marker="toolkit"):
 _add_root()
 
 import websockets  # type: ignore
-from toolkit.events import new_event, from_json, Event
+from toolkit.events import new_event, to_dict, loads, pack, Event, MSGPACK_PROTOCOL, SUBPROTOCOLS
 from toolkit.style import stylize
 try:
-    from mesh.nodes.ops.mini.mini import handle_interface_chat
+    from mesh.nodes.ops.mini.mini import stream_interface_chat
 except Exception:
-    handle_interface_chat = None
+    stream_interface_chat = None
 
-clients=set(); sessions={}
+clients={}  # ws -> Outbox
 EXPECTED_TOKEN=os.getenv("NEXUS_TOKEN")
 DOWNSTREAM=os.getenv("INTERFACE_TARGET","mini")
+CHAT_CONCURRENCY=int(os.getenv("NEXUS_CHAT_CONCURRENCY","8"))  # LLM calls in flight across all sessions
+CHAT_QUEUE=int(os.getenv("NEXUS_CHAT_QUEUE","4"))  # Chats one session may have queued before it gets busy replies
+OUTBOX_LIMIT=int(os.getenv("NEXUS_OUTBOX","256"))  # Frames queued per connection
+SLOW_POLICY=os.getenv("NEXUS_SLOW_POLICY","drop_oldest")  # drop_oldest | coalesce | disconnect, once an outbox is full
+SESSION_TTL=float(os.getenv("NEXUS_SESSION_TTL","0"))  # Forget sessions silent this many seconds (0 = only on disconnect)
+WORKERS=int(os.getenv("NEXUS_WORKERS","1"))  # Gateway processes sharing the port (SO_REUSEPORT)
+BUS_QUEUE=int(os.getenv("NEXUS_BUS_QUEUE","4096"))  # Frames queued per peer worker before the oldest output is dropped
 
-def _register(ws,sid): 
-    if not sid: return
-    sessions.setdefault(sid,set()).add(ws)
+class SessionRegistry:
+    """session id <-> sockets, both ways. A session exists only while it has a socket, so broadcasts
+    visit live sessions alone and a disconnect touches just the sessions of that socket."""
+    def __init__(self):
+        self.members={}; self.by_ws={}; self.seen={}  # sid -> sockets; ws -> sids; sid -> last inbound (monotonic)
+        self.on_change=None  # Called with (sid, live) when a session gains its first or loses its last socket
+
+    def add(self,ws,sid):
+        if not sid: return
+        new=sid not in self.members
+        self.members.setdefault(sid,set()).add(ws); self.by_ws.setdefault(ws,set()).add(sid); self.seen[sid]=time.monotonic()
+        if new and self.on_change: self.on_change(sid,True)
+
+    def get(self,sid):
+        return self.members.get(sid,frozenset())
+
+    def of(self,ws):
+        return self.by_ws.get(ws,())
+
+    def drop(self,ws):
+        for sid in self.by_ws.pop(ws,()):
+            socks=self.members[sid]; socks.discard(ws)
+            if not socks:
+                del self.members[sid], self.seen[sid]
+                if self.on_change: self.on_change(sid,False)
+
+    def expire(self,ttl):
+        """Forget sessions with no inbound traffic for ttl seconds; their sockets rejoin on their next message.
+        Returns {sid: sockets} of what was forgotten, since a disconnect can no longer find those pairs."""
+        cutoff=time.monotonic()-ttl; stale={sid:self.members[sid] for sid,seen in self.seen.items() if seen<cutoff}
+        for sid,socks in stale.items():
+            del self.members[sid]
+            for ws in socks:
+                sids=self.by_ws[ws]; sids.discard(sid)
+                if not sids: del self.by_ws[ws]
+            del self.seen[sid]
+            if self.on_change: self.on_change(sid,False)
+        return stale
+
+    def counts(self):
+        return {"sessions":len(self.members),"sockets":len(self.by_ws)}
+
+sessions=SessionRegistry()
+
+class TopicTrie:
+    """Topic subscriptions as a trie over dot-separated segments. A pattern matches its own topic and
+    everything below it: "chat.output" covers chat.output.delta; "chat.*" is the same as "chat"; "*" is all."""
+    def __init__(self):
+        self.root={}; self.patterns={}  # segment -> child node, None -> subscribed sockets; ws -> segment tuples
+
+    @staticmethod
+    def _segments(pattern):
+        parts=[p for p in pattern.split(".") if p]
+        return tuple(parts[:-1] if parts and parts[-1]=="*" else parts)
+
+    def subscribe(self,ws,patterns):
+        """Replaces ws's previous patterns"""
+        self.unsubscribe(ws)
+        keys={self._segments(pattern) for pattern in patterns}  # "chat.output" and "chat.output.*" are one node
+        for segs in keys:
+            node=self.root
+            for seg in segs: node=node.setdefault(seg,{})
+            node.setdefault(None,set()).add(ws)
+        self.patterns[ws]=keys
+
+    def unsubscribe(self,ws):
+        for segs in self.patterns.pop(ws,()):
+            path=[self.root]
+            for seg in segs:
+                node=path[-1].get(seg)
+                if node is None: break
+                path.append(node)
+            else:
+                subscribers=path[-1].get(None,set()); subscribers.discard(ws)
+                if not subscribers: path[-1].pop(None,None)
+            for seg,parent,node in reversed(list(zip(segs,path,path[1:]))):
+                if node: break
+                del parent[seg]  # Prune branches nobody listens on
+
+    def match(self,topic):
+        """Sockets subscribed to topic: one walk down its segments"""
+        node=self.root; found=set(node.get(None,()))
+        for seg in (topic or "").split("."):
+            node=node.get(seg)
+            if node is None: break
+            found.update(node.get(None,()))
+        return found
+
+topics=TopicTrie()
+
+class Outbox:
+    """A connection's outbound frames, written by its own task so a slow reader only ever delays itself.
+    Frames with a key (grid ticks) are the ones a full outbox gives up first; under "coalesce" a newer
+    frame with the same key replaces the queued one instead of queueing behind it."""
+    def __init__(self,ws,limit,policy):
+        self.ws=ws; self.limit=limit; self.policy=policy; self.binary=ws.subprotocol==MSGPACK_PROTOCOL
+        self.frames=deque(); self.ready=asyncio.Event()  # (key, frame)
+        self.stats={"sent":0,"dropped":0,"coalesced":0,"max_depth":0}
+        self.closed=False; self.task=asyncio.create_task(self._write())
+
+    def put(self,frame,key=None):
+        if self.closed: return
+        if key and self.policy=="coalesce":
+            for i,(k,_) in enumerate(self.frames):
+                if k==key: self.frames[i]=(key,frame); self.stats["coalesced"]+=1; return
+        if len(self.frames)>=self.limit:
+            if self.policy=="disconnect":
+                self.stats["dropped"]+=len(self.frames)+1; self.frames.clear(); self.close()
+                asyncio.create_task(self.ws.close(code=1013, reason="Outbound queue full")); return
+            victim=next((i for i,(k,_) in enumerate(self.frames) if k), 0)  # Oldest tick, else oldest frame
+            del self.frames[victim]; self.stats["dropped"]+=1
+        self.frames.append((key,frame)); self.ready.set()
+        self.stats["max_depth"]=max(self.stats["max_depth"],len(self.frames))
+
+    def close(self):
+        self.closed=True; self.task.cancel()
+
+    async def _write(self):
+        try:
+            while True:
+                await self.ready.wait()
+                while self.frames:
+                    await self.ws.send(self.frames.popleft()[1]); self.stats["sent"]+=1
+                self.ready.clear()
+        except websockets.ConnectionClosed:
+            self.closed=True
+
+    def report(self):
+        return dict(self.stats, depth=len(self.frames), policy=self.policy, codec=self.ws.subprotocol or "json", peer=str(self.ws.remote_address))
+
+def _deliver(socks,frame,key=None,topic=None,msg=None):
+    """Queue the event `msg` for socks, serialized at most once per codec: JSON is `frame` when the caller
+    already has it, msgpack is packed straight from `msg`; sockets with topic subscriptions only get the
+    topics they asked for"""
+    wanted=topics.match(topic) if topic is not None and topics.patterns else None
+    packed=None
+    for ws in socks:
+        if wanted is not None and ws not in wanted and ws in topics.patterns: continue
+        box=clients.get(ws)
+        if not box: continue
+        if box.binary:
+            if packed is None: packed=pack(msg)
+            box.put(packed,key)
+        else:
+            if frame is None: frame=json.dumps(msg)
+            box.put(frame,key)
 
 async def _send_to_session(sid,payload):
-    raw=json.dumps(payload)
-    for ws in list(sessions.get(sid,set())):
-        if ws.open: await ws.send(raw)
+    topic=payload.get("topic")
+    _deliver(sessions.get(sid), None, topic=topic, msg=payload)
+    if bus:
+        for peer in bus.holders(sid): bus.send(peer,"session",sid,topic,payload)
+
+class WorkerBus:
+    """Links the gateway processes of a multi-worker Nexus over Unix sockets. Each worker announces
+    the sessions it holds sockets for, so an output for a session goes to exactly the workers that
+    hold it; ticks and relays go to every peer, which fans them out to its own sockets.
+    Each peer has a bounded queue drained by its own task, so a stalled peer only delays itself."""
+    def __init__(self,index,count,base,limit=BUS_QUEUE):
+        self.index=index; self.paths=[f"{base}.{i}.sock" for i in range(count)]; self.limit=limit
+        self.peers={}; self.remote={}  # worker -> stream writer while linked; sid -> workers holding it
+        self.queues={peer:deque() for peer in range(count) if peer!=index}  # (droppable, frame)
+        self.ready={peer:asyncio.Event() for peer in self.queues}
+        self.stats={"sent":0,"received":0,"dropped":0,"reconnects":0}
+
+    async def start(self):
+        path=self.paths[self.index]
+        if os.path.exists(path): os.unlink(path)  # Left over from a previous run
+        await asyncio.start_unix_server(self._serve,path,limit=1<<24)
+        for peer in self.queues: asyncio.create_task(self._link(peer))
+
+    async def _connect(self,peer):
+        while True:
+            try:
+                return await asyncio.open_unix_connection(self.paths[peer])
+            except OSError:
+                await asyncio.sleep(0.1)  # Peer still starting, or restarting
+
+    async def _link(self,peer):
+        """Drain a peer's queue, reconnecting whenever the link closes"""
+        frames,ready=self.queues[peer],self.ready[peer]
+        while True:
+            reader,writer=await self._connect(peer); self.peers[peer]=writer
+            closed=asyncio.create_task(reader.read())  # Peers never write back, so this ends at EOF
+            try:
+                # A (re)started peer knows nothing of our sessions; claims go ahead of the backlog
+                writer.write(b"".join(self._frame("claim",sid) for sid in sessions.members))
+                while not closed.done():
+                    while frames:
+                        writer.write(frames.popleft()[1]); self.stats["sent"]+=1
+                        await writer.drain()  # Waits only once the peer's socket buffer is full
+                    ready.clear(); waiter=asyncio.create_task(ready.wait())
+                    await asyncio.wait((closed,waiter),return_when=asyncio.FIRST_COMPLETED); waiter.cancel()
+            except OSError:
+                pass
+            finally:
+                self.peers.pop(peer,None); closed.cancel(); writer.close()
+            self.stats["reconnects"]+=1
+
+    def _frame(self,op,*fields):
+        return (json.dumps([op,self.index,*fields])+"\n").encode()
+
+    def send(self,peer,op,*fields):
+        frames=self.queues[peer]
+        if len(frames)>=self.limit:
+            # Outputs and ticks give way; claims and releases never do, or routing would go stale
+            victim=next((i for i,(droppable,_) in enumerate(frames) if droppable),None)
+            if victim is not None: del frames[victim]; self.stats["dropped"]+=1
+        frames.append((op not in ("claim","release"),self._frame(op,*fields))); self.ready[peer].set()
+
+    def publish(self,op,*fields):
+        for peer in self.queues: self.send(peer,op,*fields)
+
+    def holders(self,sid):
+        return self.remote.get(sid,())
+
+    def session_changed(self,sid,live):
+        self.publish("claim" if live else "release",sid)
+
+    async def _serve(self,reader,writer):
+        src=None
+        try:
+            while line:=await reader.readline():
+                op,src,*fields=json.loads(line); self.stats["received"]+=1
+                if op=="claim": self.remote.setdefault(fields[0],set()).add(src)
+                elif op=="release":
+                    holders=self.remote.get(fields[0],set()); holders.discard(src)
+                    if not holders: self.remote.pop(fields[0],None)
+                elif op=="session":
+                    sid,topic,payload=fields; _deliver(sessions.get(sid),None,topic=topic,msg=payload)
+                elif op=="tick":
+                    fanout.send(sessions.members,*fields)
+                elif op=="relay":
+                    topic,sid,msg=fields; targets=topics.match(topic)
+                    if sid: targets&=sessions.get(sid)
+                    _deliver(targets,None,msg=msg)
+        except (OSError, ValueError):
+            pass  # Reset, or a torn last line, from a worker that died; its sessions go below like on a clean EOF
+        finally:
+            # A worker that goes away takes its sessions with it, however its link ended
+            for sid in [sid for sid,holders in self.remote.items() if src in holders]:
+                self.remote[sid].discard(src)
+                if not self.remote[sid]: del self.remote[sid]
+            writer.close()
+
+    def report(self):
+        return dict(self.stats, worker=self.index, peers=len(self.peers), remote_sessions=len(self.remote), queued={str(peer):len(q) for peer,q in self.queues.items()})  # str keys: msgpack clients reject int map keys
+
+bus=None
+
+SID_SLOT="\x00sid\x00"  # Stands in for the session id in broadcast templates; cannot occur in a real id
+
+def _fill(o,sid):
+    """A broadcast template with SID_SLOT replaced by sid, for msgpack, whose length-prefixed strings cannot be patched"""
+    if isinstance(o,str): return o.replace(SID_SLOT,sid)
+    if isinstance(o,dict): return {k:_fill(v,sid) for k,v in o.items()}
+    if isinstance(o,list): return [_fill(v,sid) for v in o]
+    return o
+
+class Fanout:
+    """One serialization per broadcast: the frame is built once around SID_SLOT and patched per session,
+    then queued on every socket's outbox without waiting on any of them"""
+    def __init__(self,window=1000):
+        self.samples=deque(maxlen=window)  # Milliseconds per broadcast
+        self.stats={"broadcasts":0,"frames":0,"sockets":0}
+
+    def send(self,targets,payload,key=None):
+        """targets: {session_id: sockets}; payload: event dict mentioning the session only as SID_SLOT"""
+        started=time.perf_counter()
+        parts=json.dumps(payload).split(json.dumps(SID_SLOT)[1:-1]); topic=payload.get("topic")
+        for sid,socks in targets.items():
+            if socks:
+                binary=any(clients[ws].binary for ws in socks if ws in clients)
+                _deliver(socks, json.dumps(sid)[1:-1].join(parts), key, topic, _fill(payload,sid) if binary else None)
+                self.stats["frames"]+=1; self.stats["sockets"]+=len(socks)
+        self.stats["broadcasts"]+=1; self.samples.append((time.perf_counter()-started)*1000)
+
+    def report(self):
+        ms=sorted(self.samples) or [0.0]
+        return dict(self.stats, last_ms=self.samples[-1] if self.samples else 0.0, p50_ms=statistics.median(ms), p99_ms=ms[min(len(ms)-1,int(len(ms)*0.99))], max_ms=ms[-1])
+
+fanout=Fanout()
 
 def _sim_hass(ev: Event):
     if ev.topic!="home.command": return None
@@ -44,7 +331,79 @@ def _sim_hass(ev: Event):
     else:
         txt=f"Sim HUD: home command: {cmd}"
     out=new_event("interface.output","nexus:sim.hass","notification",{"text": stylize(txt,channel='ui',session_id=sid,corr_id=meta.get('corr_id'))},meta={"session_id":sid,"corr_id":meta.get("corr_id")})
-    return asdict(out)
+    return to_dict(out)
+
+def _notify(sid,corr_id,source,text,**extra):
+    return to_dict(new_event("interface.output",source,"notification",{"text": stylize(text,channel='ui',session_id=sid,corr_id=corr_id),**extra},meta={"session_id":sid,"corr_id":corr_id}))
+
+async def _stream_chat(sid,text,corr_id):
+    # The mini generator blocks on the LLM, so it runs on a thread and hands events back one by one
+    loop=asyncio.get_running_loop(); q=asyncio.Queue(); stop=threading.Event()
+    def pump():
+        gen=stream_interface_chat(text,sid,corr_id)
+        try:
+            for ev in gen:
+                if stop.is_set(): break  # Cancelled: closing the generator closes the LLM stream
+                loop.call_soon_threadsafe(q.put_nowait,ev)
+        except Exception as e:
+            loop.call_soon_threadsafe(q.put_nowait,e)
+        finally:
+            gen.close(); loop.call_soon_threadsafe(q.put_nowait,None)
+    done=asyncio.ensure_future(asyncio.to_thread(pump))
+    try:
+        await _forward_chat(sid,corr_id,q)
+    finally:
+        stop.set(); await asyncio.shield(done)  # Hold the concurrency slot until the thread lets go
+
+async def _forward_chat(sid,corr_id,q):
+    while (ev:=await q.get()) is not None:
+        if isinstance(ev,Exception):
+            await _send_to_session(sid, _notify(sid,corr_id,"nexus:mini",f"Chat failed: {ev}"))
+        elif ev.topic in ("chat.output.delta","chat.output"):
+            out=new_event("interface.output","nexus:mini",ev.topic, ev.payload, meta={"session_id":sid,"corr_id":ev.meta.get("corr_id")})
+            await _send_to_session(sid, to_dict(out))
+        elif ev.topic=="home.command":
+            sim=_sim_hass(ev)
+            if sim: await _send_to_session(sid, sim)
+
+class ChatDispatcher:
+    """Runs chats off the receive loop: at most `limit` at once overall, one at a time and in order per session,
+    at most `depth` waiting per session. A disconnecting socket takes its queued and running chats with it."""
+    def __init__(self,limit,depth):
+        self.slots=asyncio.Semaphore(limit); self.depth=depth
+        self.queues={}; self.running={}  # sid -> deque of (ws,text,corr_id) / (ws,task)
+        self.stats={"accepted":0,"busy":0,"cancelled":0,"failed":0}
+
+    def submit(self,ws,sid,text,corr_id):
+        """False when the session already has `depth` chats waiting"""
+        q=self.queues.get(sid)
+        if q is None:
+            q=self.queues[sid]=deque(); asyncio.create_task(self._drain(sid,q))
+        if len(q)>=self.depth:
+            self.stats["busy"]+=1; return False
+        q.append((ws,text,corr_id)); self.stats["accepted"]+=1; return True
+
+    async def _drain(self,sid,q):
+        while q:
+            ws,text,corr_id=q.popleft()
+            if ws is None: continue  # Cancelled while queued
+            async with self.slots:
+                task=asyncio.create_task(_stream_chat(sid,text,corr_id)); self.running[sid]=(ws,task)
+                await asyncio.wait({task}); self.running.pop(sid,None)
+            if task.cancelled(): self.stats["cancelled"]+=1
+            elif task.exception(): self.stats["failed"]+=1; print(f"Chat dispatch failed for {sid}: {task.exception()}")
+        del self.queues[sid]  # No await since the last check, so nothing slipped in
+
+    def cancel(self,ws,sids):
+        """Drop ws's chats in the sessions it belonged to"""
+        for sid in sids:
+            q=self.queues.get(sid)
+            for i,item in enumerate(q or ()):
+                if item[0] is ws: q[i]=(None,None,None); self.stats["cancelled"]+=1
+            running=self.running.get(sid)
+            if running and running[0] is ws: running[1].cancel()
+
+dispatcher=None
 
 async def handler(ws):
     # websockets v12 passes only the connection; path available as ws.path
@@ -56,52 +415,98 @@ async def handler(ws):
             params={}
         if params.get("token")!=EXPECTED_TOKEN:
             await ws.close(code=1008, reason="Unauthorized"); return
-    clients.add(ws)
+    clients[ws]=Outbox(ws,OUTBOX_LIMIT,SLOW_POLICY)
     try:
         async for raw in ws:
-            try: msg=json.loads(raw)
+            try: msg=loads(raw)
             except Exception: continue
+            if isinstance(raw,bytes): raw=None  # JSON sockets get it re-serialized from msg, only if any are targeted
             t=msg.get("type"); topic=msg.get("topic"); meta=msg.get("meta") or {}; payload=msg.get("payload") or {}
             sid=meta.get("session_id")
-            if sid: _register(ws,sid)
+            sessions.add(ws,sid)
+
+            if t=="interface.subscribe":
+                # Sent once on connect: which topics this socket wants, and which extra sessions it follows
+                topics.subscribe(ws, [str(p) for p in payload.get("topics") or []])
+                for s in payload.get("sessions") or []: sessions.add(ws,str(s))
+                continue
+
+            if t=="interface.input" and topic=="control.stats":
+                r=fanout.report(); boxes=[box.report() for box in clients.values()]
+                await _send_to_session(sid, _notify(sid,meta.get("corr_id"),"nexus:control",f"Fan-out: {r['broadcasts']} broadcasts, {r['frames']} frames, p50 {r['p50_ms']:.2f}ms p99 {r['p99_ms']:.2f}ms | outboxes: {len(boxes)}, dropped {sum(b['dropped'] for b in boxes)} | live sessions: {len(sessions.members)}",stats={"fanout":r,"dispatch":dispatcher.stats,"outboxes":boxes,"sessions":sessions.counts(),"bus":bus.report() if bus else None})); continue
 
             if t=="interface.input" and topic and topic.startswith("control."):
-                out=new_event("interface.output","nexus:control","notification",{"text": stylize(f"Control ack: {topic}",channel='ui',session_id=sid,corr_id=meta.get('corr_id'))},meta={"session_id":sid,"corr_id":meta.get("corr_id")})
-                await _send_to_session(sid, asdict(out)); continue
+                await _send_to_session(sid, _notify(sid,meta.get("corr_id"),"nexus:control",f"Control ack: {topic}")); continue
 
             if t=="grid.tick":
                 n=payload.get("n")
-                for s in list(sessions.keys()):
-                    out=new_event("interface.output","nexus:grid","notification",{"text": stylize(f"Tick {n}",channel='grid',session_id=s,corr_id=meta.get('corr_id'))},meta={"session_id":s,"corr_id":meta.get("corr_id")})
-                    await _send_to_session(s, asdict(out))
+                out=new_event("interface.output","nexus:grid","notification",{"text": stylize(f"Tick {n}",channel='grid',session_id=SID_SLOT,corr_id=meta.get('corr_id'))},meta={"session_id":SID_SLOT,"corr_id":meta.get("corr_id")})
+                out=to_dict(out); fanout.send(sessions.members, out, key="grid.tick")
+                if bus: bus.publish("tick", out, "grid.tick")
                 continue
 
             if t=="interface.input" and topic=="chat.input":
-                if DOWNSTREAM=="mini" and handle_interface_chat:
-                    outs=handle_interface_chat(str(payload.get("text") or ""), sid, meta.get("corr_id"))
-                    for ev in outs:
-                        if ev.topic=="chat.output":
-                            out=new_event("interface.output","nexus:mini","chat.output", ev.payload, meta={"session_id":sid,"corr_id":ev.meta.get("corr_id")})
-                            await _send_to_session(sid, asdict(out))
-                        elif ev.topic=="home.command":
-                            sim=_sim_hass(ev)
-                            if sim: await _send_to_session(sid, sim)
+                if DOWNSTREAM=="mini" and stream_interface_chat:
+                    if not dispatcher.submit(ws, sid, str(payload.get("text") or ""), meta.get("corr_id")):
+                        await _send_to_session(sid, _notify(sid,meta.get("corr_id"),"nexus:dispatch",f"Busy: {dispatcher.depth} chats already queued for this session, try again shortly",busy=True))
                     continue
                 else:
                     out=new_event("interface.output","nexus:echo","chat.output",{"text": stylize(f"Echo return: {payload.get('text','')}",channel='ui',session_id=sid,corr_id=meta.get('corr_id'))},meta={"session_id":sid,"corr_id":meta.get("corr_id")})
-                    await _send_to_session(sid, asdict(out)); continue
+                    await _send_to_session(sid, to_dict(out)); continue
 
-            for c in list(clients):
-                if c.open: await c.send(raw)
+            # Anything else is relayed to the sockets subscribed to its topic, within its session if it names one
+            targets=topics.match(topic)
+            if sid: targets&=sessions.get(sid)
+            _deliver(targets, raw, msg=msg)
+            if bus:
+                for peer in (bus.holders(sid) if sid else bus.queues): bus.send(peer,"relay",topic,sid,msg)
     finally:
-        clients.discard(ws)
-        for s in list(sessions.values()): s.discard(ws)
+        clients.pop(ws).close()
+        dispatcher.cancel(ws, sessions.of(ws)); sessions.drop(ws); topics.unsubscribe(ws)
 
-async def main():
-    host=os.getenv("NEXUS_HOST","127.0.0.1"); port=int(os.getenv("NEXUS_PORT","7000"))
-    async with websockets.serve(handler, host, port):
-        print(f"Nexus WS gateway on ws://{host}:{port} (target={DOWNSTREAM})")
+async def _expire_sessions(ttl):
+    while True:
+        await asyncio.sleep(min(ttl/4,60))
+        stale=sessions.expire(ttl)
+        for sid,socks in stale.items():
+            for ws in socks: dispatcher.cancel(ws,(sid,))  # Work the disconnect would otherwise never cancel
+        if stale: print(f"Expired {len(stale)} idle sessions ({sessions.counts()['sessions']} live)")
+
+async def serve(host,port,index=0,workers=1):
+    global dispatcher, bus
+    dispatcher=ChatDispatcher(CHAT_CONCURRENCY,CHAT_QUEUE)
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(CHAT_CONCURRENCY+4,thread_name_prefix="nexus-chat"))  # Room for every chat slot
+    if SESSION_TTL>0: asyncio.create_task(_expire_sessions(SESSION_TTL))
+    if workers>1:
+        bus=WorkerBus(index,workers,os.getenv("NEXUS_BUS",f"/tmp/nexus-{port}")); sessions.on_change=bus.session_changed
+        await bus.start()
+    async with websockets.serve(handler, host, port, reuse_port=workers>1, subprotocols=list(SUBPROTOCOLS)):
+        print(f"Nexus WS gateway on ws://{host}:{port} (target={DOWNSTREAM}" + (f", worker {index+1}/{workers})" if workers>1 else ")"))
         await asyncio.Future()
 
+async def _orphan_watch(parent):
+    # SIGKILL on the supervisor skips its cleanup; a worker left holding the port would keep taking connections
+    while os.getppid()==parent: await asyncio.sleep(1)
+    os._exit(0)
+
+def _worker(host,port,index,workers,parent):
+    async def run():
+        asyncio.create_task(_orphan_watch(parent)); await serve(host,port,index,workers)
+    try: asyncio.run(run())
+    except KeyboardInterrupt: pass
+
+def main():
+    host=os.getenv("NEXUS_HOST","127.0.0.1"); port=int(os.getenv("NEXUS_PORT","7000"))
+    if WORKERS<=1:
+        asyncio.run(serve(host,port)); return
+    # The kernel spreads new connections across the workers' listening sockets
+    procs=[multiprocessing.get_context("spawn").Process(target=_worker,args=(host,port,i,WORKERS,os.getpid()),name=f"nexus-{i}",daemon=True) for i in range(WORKERS)]
+    for p in procs: p.start()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # Exit normally so the daemon workers are stopped too
+    try:
+        for p in procs: p.join()
+    except KeyboardInterrupt:
+        pass
+
 if __name__=="__main__":
-    asyncio.run(main())
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Event codec microbenchmark
+
+Times encode and decode of a typical gateway event with each codec:
+
+    python scripts/bench_events.py
+    python scripts/bench_events.py --number 200000 --text-size 2000
+
+"asdict+json" is the pre-codec path (dataclasses.asdict, then json.dumps);
+msgpack rows appear only when msgpack is installed.
+"""
+
+import argparse
+import json
+import sys
+import time
+import timeit
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from toolkit import events
+from toolkit.events import Event, new_event, to_json, from_json
+
+def legacy_from_json(s):
+    """from_json as it was: eager uuid4()/time() fallbacks on every call"""
+    o = json.loads(s)
+    return Event(
+        o.get("id", str(uuid.uuid4())),
+        float(o.get("ts", time.time())),
+        o.get("type", ""),
+        o.get("source", ""),
+        list(o.get("targets", [])),
+        o.get("topic", ""),
+        o.get("payload"),
+        dict(o.get("meta", {}))
+    )
+
+def sample(text_size: int) -> Event:
+    sid = str(uuid.uuid4())
+    return new_event("interface.output", "nexus:mini", "chat.output", {"text": "x" * text_size, "seq": 12},
+                     meta={"session_id": sid, "corr_id": str(uuid.uuid4())})
+
+def per_op_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare toolkit.events codecs")
+    parser.add_argument("--number", type=int, default=50000, help="operations per timing run")
+    parser.add_argument("--text-size", type=int, default=200, help="payload text length")
+    args = parser.parse_args()
+
+    ev = sample(args.text_size)
+    as_json = to_json(ev)
+    rows = [
+        ("asdict+json", lambda: json.dumps(asdict(ev)), lambda: legacy_from_json(as_json), len(as_json.encode())),
+        ("json", lambda: to_json(ev), lambda: from_json(as_json), len(as_json.encode())),
+    ]
+    if events.msgpack:
+        as_msgpack = events.to_msgpack(ev)
+        rows.append(("msgpack", lambda: events.to_msgpack(ev), lambda: events.from_msgpack(as_msgpack), len(as_msgpack)))
+
+    print(f"{'codec':<12} {'encode us':>10} {'decode us':>10} {'bytes':>7}")
+    for name, enc, dec, size in rows:
+        print(f"{name:<12} {per_op_us(enc, args.number):>10.2f} {per_op_us(dec, args.number):>10.2f} {size:>7}")
+    if not events.msgpack:
+        print("(msgpack not installed: pip install msgpack)")
+
+if __name__ == "__main__":
+    main()
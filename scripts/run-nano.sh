@@ -15,6 +15,7 @@ export NEXUS_URL=${NEXUS_URL:-ws://${NEXUS_HOST}:${NEXUS_PORT}}
 export INTERFACE_ID=${INTERFACE_ID:-nano}
 export INTERFACE_TARGET=${INTERFACE_TARGET:-mini}
 export GRID_TICK_MS=${GRID_TICK_MS:-1000}
+export NEXUS_WORKERS=${NEXUS_WORKERS:-1}
 
 # Lightweight dependency ensure
 python3 -m pip -q install -r requirements.txt || true
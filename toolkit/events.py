@@ -1,7 +1,12 @@
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 import time, uuid, json
 
-@dataclass
+try:
+    import msgpack  # Optional: compact binary frames for connections that negotiate it
+except ImportError:
+    msgpack = None
+
+@dataclass(slots=True)
 class Event:
     id: str
     ts: float
@@ -12,6 +17,13 @@ class Event:
     payload: object
     meta: dict
 
+FIELDS = ("id", "ts", "type", "source", "targets", "topic", "payload", "meta")
+
+# Websocket subprotocols in order of preference; a peer that offers none gets JSON
+MSGPACK_PROTOCOL = "nexus.msgpack"
+JSON_PROTOCOL = "nexus.json"
+SUBPROTOCOLS = ((MSGPACK_PROTOCOL,) if msgpack else ()) + (JSON_PROTOCOL,)
+
 def new_event(type, source, topic, payload, targets=None, meta=None, corr_id=None, session_id=None):
     m = dict(meta or {})
     if session_id:
@@ -20,18 +32,59 @@ def new_event(type, source, topic, payload, targets=None, meta=None, corr_id=Non
         m["corr_id"] = corr_id or str(uuid.uuid4())
     return Event(str(uuid.uuid4()), time.time(), type, source, targets or [], topic, payload, m)
 
-def to_json(e):
-    return json.dumps(asdict(e), ensure_ascii=False)
+def to_dict(e):
+    # Shallow, unlike dataclasses.asdict: payload and meta are shared, not deep-copied
+    return {"id": e.id, "ts": e.ts, "type": e.type, "source": e.source, "targets": e.targets,
+            "topic": e.topic, "payload": e.payload, "meta": e.meta}
 
-def from_json(s):
-    o = json.loads(s)
+def from_dict(o):
+    ts = o.get("ts")
     return Event(
-        o.get("id", str(uuid.uuid4())),
-        float(o.get("ts", time.time())),
+        o.get("id") or str(uuid.uuid4()),
+        float(ts) if ts is not None else time.time(),
         o.get("type", ""),
         o.get("source", ""),
-        list(o.get("targets", [])),
+        list(o.get("targets") or ()),
         o.get("topic", ""),
         o.get("payload"),
-        dict(o.get("meta", {}))
+        dict(o.get("meta") or ())
     )
+
+def to_json(e):
+    return json.dumps(to_dict(e), ensure_ascii=False)
+
+def from_json(s):
+    return from_dict(json.loads(s))
+
+def to_msgpack(e):
+    # Events travel as a field array; the names are implied by FIELDS
+    return msgpack.packb([e.id, e.ts, e.type, e.source, e.targets, e.topic, e.payload, e.meta])
+
+def from_msgpack(b):
+    o = msgpack.unpackb(b)
+    return Event(*o) if isinstance(o, list) else from_dict(o)
+
+def encode(e, protocol=None):
+    """Wire frame for a connection that negotiated `protocol` (ws.subprotocol)"""
+    return to_msgpack(e) if protocol == MSGPACK_PROTOCOL else to_json(e)
+
+def decode(data):
+    """Event from a frame of either codec: bytes are msgpack, text is JSON"""
+    return from_msgpack(data) if isinstance(data, (bytes, bytearray)) else from_json(data)
+
+def loads(data):
+    """Frame of either codec as a plain dict, for routers that never need an Event"""
+    if isinstance(data, (bytes, bytearray)):
+        o = msgpack.unpackb(data)
+        return dict(zip(FIELDS, o)) if isinstance(o, list) else o
+    return json.loads(data)
+
+def pack(o):
+    """Plain object -> msgpack frame; event-shaped dicts become field arrays"""
+    if isinstance(o, dict) and len(o) == len(FIELDS) and all(k in o for k in FIELDS):
+        o = [o[k] for k in FIELDS]
+    return msgpack.packb(o)
+
+def transcode(frame):
+    """JSON frame -> msgpack frame, for callers that only have the JSON"""
+    return pack(json.loads(frame))
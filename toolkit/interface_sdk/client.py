@@ -1,13 +1,15 @@
 import asyncio
-import json
 import os
 import uuid
-from dataclasses import asdict
 from typing import AsyncIterator
 
 import websockets  # type: ignore
 
-from toolkit.events import new_event, from_json
+from toolkit.events import new_event, encode, decode, SUBPROTOCOLS
+
+
+# Topic prefixes an interface renders: replies (chat.output covers chat.output.delta) and notifications
+DEFAULT_TOPICS = ("chat.output", "notification")
 
 
 def _with_token(url: str, token: str | None) -> str:
@@ -15,15 +17,38 @@ def _with_token(url: str, token: str | None) -> str:
 
 
 class InterfaceClient:
-    def __init__(self, interface_id: str | None = None, nexus_url: str | None = None, session_id: str | None = None, token: str | None = None):
+    def __init__(self, interface_id: str | None = None, nexus_url: str | None = None, session_id: str | None = None, token: str | None = None,
+                 topics: tuple | list = DEFAULT_TOPICS, codecs: tuple | list = SUBPROTOCOLS):
         self.interface_id = interface_id or os.getenv("INTERFACE_ID", "nano")
         self.session_id = session_id or str(uuid.uuid4())
         self.nexus_url = nexus_url or os.getenv("NEXUS_URL", "ws://127.0.0.1:7000")
         self.token = token or os.getenv("NEXUS_TOKEN")
+        self.topics = list(topics)
+        self.codecs = list(codecs)  # Wire formats offered, preferred first; Nexus picks one
         self.ws: websockets.WebSocketClientProtocol | None = None
 
     async def connect(self):
-        self.ws = await websockets.connect(_with_token(self.nexus_url, self.token))
+        self.ws = await websockets.connect(_with_token(self.nexus_url, self.token), subprotocols=self.codecs)
+        await self.subscribe(self.topics)
+
+    @property
+    def codec(self) -> str:
+        return self.ws.subprotocol if self.ws and self.ws.subprotocol else "json"
+
+    async def subscribe(self, topics: list, sessions: list | None = None):
+        """Tell Nexus which topics (prefix patterns, "*" for all) and extra sessions this connection wants;
+        replaces any earlier subscription. The gateway then sends nothing else."""
+        assert self.ws is not None, "Not connected"
+        self.topics = list(topics)
+        ev = new_event(
+            type="interface.subscribe",
+            source=f"interface:{self.interface_id}",
+            topic="control.subscribe",
+            payload={"topics": self.topics, "sessions": list(sessions or [])},
+            meta={},
+            session_id=self.session_id,
+        )
+        await self.ws.send(encode(ev, self.ws.subprotocol))
 
     async def close(self):
         if self.ws:
@@ -39,7 +64,7 @@ class InterfaceClient:
             meta={},
             session_id=self.session_id,
         )
-        await self.ws.send(json.dumps(asdict(ev)))
+        await self.ws.send(encode(ev, self.ws.subprotocol))
 
     async def send_control(self, control: str, payload: dict | None = None):
         assert self.ws is not None, "Not connected"
@@ -51,14 +76,18 @@ class InterfaceClient:
             meta={},
             session_id=self.session_id,
         )
-        await self.ws.send(json.dumps(asdict(ev)))
+        await self.ws.send(encode(ev, self.ws.subprotocol))
 
-    async def recv_outputs(self) -> AsyncIterator:
+    async def recv_outputs(self, deltas: bool = True) -> AsyncIterator:
+        """Outputs for this session's subscribed topics (the gateway does the routing); streamed replies
+        arrive as chat.output.delta events (same corr_id) followed by the complete chat.output.
+        deltas=False yields only the latter."""
         assert self.ws is not None, "Not connected"
         async for raw in self.ws:
             try:
-                ev = from_json(raw)
+                ev = decode(raw)
             except Exception:
                 continue
-            if ev.type == "interface.output" and ev.meta.get("session_id") == self.session_id:
-                yield ev
+            if ev.topic == "chat.output.delta" and not deltas:
+                continue
+            yield ev
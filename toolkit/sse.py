@@ -0,0 +1,15 @@
+import json
+
+def sse_deltas(response):
+    """Content chunks of a streamed (OpenAI-style server-sent events) chat completion"""
+    for line in response.iter_lines():
+        line = line.decode("utf-8")
+        if not line.startswith("data: "):
+            continue  # Blank separators and ": keep-alive" comments
+        data = line[6:]
+        if data == "[DONE]":
+            break
+        choices = json.loads(data).get("choices") or [{}]
+        delta = (choices[0].get("delta") or {}).get("content")
+        if delta:
+            yield delta